@@ -0,0 +1,130 @@
+"""Command-line tools for offline work against the reference configuration.
+
+    python -m app.cli batch recordings/ --output scores.jsonl
+    python -m app.cli batch archive.zip --output scores.parquet --format parquet
+    python -m app.cli migrate --db data/references.db
+"""
+import argparse
+import contextlib
+import os
+import sys
+import time
+from pathlib import Path
+from .services.audio_decoder import RESAMPLE_TYPES
+from .services.batch import JsonlWriter, ParquetWriter, build_record, open_source, run_batch
+from .services.configuration_store import ConfigurationStore
+from .services.feature_extractor import FeatureExtractor
+from .services.pitch import PITCH_METHODS
+from .services.reference_backends import REFERENCE_BACKENDS, JsonReferenceBackend, SqliteReferenceBackend, create_backend
+from .services.reference_matrix import ReferenceMatrix
+from .settings import settings
+
+def batch(args: argparse.Namespace) -> int:
+    """Score every recording in a directory, zip or manifest against the references."""
+    items, archive = open_source(args.source)
+    total = len(items)
+
+    # Keep stdout clean for JSONL output
+    with contextlib.redirect_stdout(sys.stderr):
+        store = ConfigurationStore(
+            args.config_dir,
+            backend=create_backend(args.reference_backend, args.config_dir, args.db)
+        )
+    feature_extractor = FeatureExtractor(
+        pitch_method=args.pitch_method,
+        resample_type=args.resample_type,
+        trim_threshold_db=settings.trim_threshold_db,
+        trim_padding=settings.trim_padding
+    )
+    reference_matrix = ReferenceMatrix(store, feature_extractor)
+
+    if args.format == "parquet":
+        writer = ParquetWriter(args.output)
+    else:
+        writer = JsonlWriter(
+            args.output.open("w", encoding="utf-8") if args.output else sys.stdout,
+            close_stream=args.output is not None
+        )
+
+    started = time.perf_counter()
+    failed = 0
+    try:
+        for done, (item, analysis, error) in enumerate(run_batch(items, args.workers, feature_extractor), start=1):
+            match = None
+            if analysis is not None:
+                matches = reference_matrix.top_matches(
+                    analysis.features, top_k=1, language=args.language, symbol=args.symbol
+                )
+                match = matches[0] if matches else None
+            else:
+                failed += 1
+            writer.write(build_record(item.name, analysis, match, error))
+
+            if not args.quiet:
+                rate = done / (time.perf_counter() - started)
+                print(f"\r[{done}/{total}] {rate:.1f} files/s, {failed} failed",
+                      end="", file=sys.stderr, flush=True)
+    finally:
+        writer.close()
+        if archive is not None:
+            archive.close()
+
+    if not args.quiet:
+        print(file=sys.stderr)
+    return 1 if failed else 0
+
+def migrate(args: argparse.Namespace) -> int:
+    """Import JSON reference files into the SQLite reference database."""
+    source = JsonReferenceBackend(args.config_dir)
+    references, _ = source.scan(full=True)
+    target = SqliteReferenceBackend(args.db)
+    try:
+        # Large batches amortize the commit; re-running updates rows in place
+        for start in range(0, len(references), args.batch_size):
+            target.save_many(references[start:start + args.batch_size])
+            if not args.quiet:
+                print(f"\r[{min(start + args.batch_size, len(references))}/{len(references)}] imported",
+                      end="", file=sys.stderr, flush=True)
+    finally:
+        target.close()
+
+    if not args.quiet:
+        print(file=sys.stderr)
+        print(f"Imported {len(references)} references from {args.config_dir} into {args.db}; "
+              f"set SPEECH_REFERENCE_BACKEND=sqlite to use it", file=sys.stderr)
+    return 0
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    batch_parser = subparsers.add_parser("batch", help=batch.__doc__)
+    batch_parser.add_argument("source", type=Path, help="Directory, zip archive or manifest of audio files")
+    batch_parser.add_argument("--output", "-o", type=Path, help="Output file (default: JSONL on stdout)")
+    batch_parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    batch_parser.add_argument("--workers", "-j", type=int, default=os.cpu_count() or 1)
+    batch_parser.add_argument("--language", help="Only match references of this language")
+    batch_parser.add_argument("--symbol", help="Only match references with this symbol")
+    batch_parser.add_argument("--pitch-method", choices=PITCH_METHODS, default=settings.pitch_method)
+    batch_parser.add_argument("--resample-type", choices=RESAMPLE_TYPES, default=settings.resample_type)
+    batch_parser.add_argument("--config-dir", type=Path, default=settings.config_dir)
+    batch_parser.add_argument("--reference-backend", choices=REFERENCE_BACKENDS, default=settings.reference_backend)
+    batch_parser.add_argument("--db", type=Path, default=settings.reference_db, help="SQLite reference database")
+    batch_parser.add_argument("--quiet", "-q", action="store_true", help="Suppress progress output")
+    batch_parser.set_defaults(handler=batch)
+
+    migrate_parser = subparsers.add_parser("migrate", help=migrate.__doc__)
+    migrate_parser.add_argument("--config-dir", type=Path, default=settings.config_dir,
+                                help="Directory of JSON reference files")
+    migrate_parser.add_argument("--db", type=Path, default=settings.reference_db, help="SQLite reference database")
+    migrate_parser.add_argument("--batch-size", type=int, default=1000)
+    migrate_parser.add_argument("--quiet", "-q", action="store_true", help="Suppress progress output")
+    migrate_parser.set_defaults(handler=migrate)
+
+    args = parser.parse_args(argv)
+    if args.command == "batch" and args.format == "parquet" and not args.output:
+        parser.error("--format parquet requires --output")
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
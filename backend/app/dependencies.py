@@ -0,0 +1,45 @@
+"""Shared service instances used by more than one router."""
+from .services.analysis_engine import AnalysisEngine
+from .services.attempt_log import AttemptLog
+from .services.configuration_store import ConfigurationStore
+from .services.feature_cache import FeatureCache
+from .services.feature_extractor import FeatureExtractor
+from .services.metrics import metrics
+from .services.reference_backends import create_backend
+from .services.result_cache import ResultCache
+from .settings import settings
+
+feature_extractor = FeatureExtractor(
+    pitch_method=settings.pitch_method,
+    resample_type=settings.resample_type,
+    max_duration=settings.max_audio_duration,
+    max_channels=settings.max_audio_channels,
+    stream_after=settings.stream_analysis_after,
+    trim_threshold_db=settings.trim_threshold_db,
+    trim_padding=settings.trim_padding
+)
+
+analysis_engine = AnalysisEngine(
+    feature_extractor,
+    max_workers=settings.analysis_workers,
+    max_queue=settings.analysis_max_queue,
+    timeout=settings.analysis_timeout,
+    profile_sample_rate=settings.profile_sample_rate,
+    profile_dir=str(settings.profile_dir),
+    profile_min_seconds=settings.profile_min_seconds,
+    warm_up=settings.warm_up
+)
+
+config_store = ConfigurationStore(
+    settings.config_dir,
+    backend=create_backend(settings.reference_backend, settings.config_dir, settings.reference_db)
+)
+metrics.set_gauge("references", lambda: len(config_store))
+
+# Scored responses are only valid while their reference is unchanged
+result_cache = ResultCache(settings.result_cache_size, settings.result_cache_ttl)
+config_store.add_listener(result_cache.invalidate)
+
+feature_cache = FeatureCache(settings.feature_cache_dir)
+
+attempt_log = AttemptLog(settings.attempt_log_db, settings.progress_alpha, settings.attempt_log_queue)
@@ -1,8 +1,50 @@
-from fastapi import FastAPI
+import time
+_import_started = time.perf_counter()
+
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from .routes import configuration, audio
+from fastapi.responses import JSONResponse
+from .routes import configuration, audio, health, progress, metrics as metrics_routes
+from .dependencies import analysis_engine, attempt_log, config_store
+from .services.analysis_engine import AnalysisQueueFull, AnalysisTimeout
+from .services.audio_decoder import AudioRejected
+from .services.metrics import metrics
+from .settings import settings
+
+# Heavy libraries (librosa, numba, scipy) are only imported by analysis code
+# when it first runs, which is in the worker processes during warm-up
+import_seconds = time.perf_counter() - _import_started
+
+async def warm_up(app: FastAPI):
+    """Warm up the analysis workers, then report the app as ready."""
+    try:
+        if settings.warm_up:
+            seconds = await analysis_engine.warm_up()
+            print(f"Warm-up of {analysis_engine.max_workers} analysis workers took {seconds:.2f}s")
+    except Exception as e:
+        # Serve anyway; the first requests pay the warm-up instead
+        print(f"Warm-up failed: {str(e)}")
+    app.state.ready = True
+    metrics.set_gauge("startup_seconds", time.perf_counter() - _import_started)
+    print(f"Ready {time.perf_counter() - _import_started:.2f}s after import started")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    print(f"App imported in {import_seconds:.2f}s")
+    app.state.ready = False
+    # In the background, so the server answers probes while workers warm up
+    warm_up_task = asyncio.create_task(warm_up(app))
+    yield
+    warm_up_task.cancel()
+    # Stop analysis worker processes on shutdown
+    analysis_engine.shutdown()
+    config_store.close()
+    # Write attempts still queued
+    attempt_log.close()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -13,9 +55,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template, not raw path, to keep series bounded
+    route = request.scope.get("route")
+    metrics.observe(
+        "http_request_seconds",
+        time.perf_counter() - started,
+        method=request.method,
+        route=getattr(route, "path", "unmatched"),
+        status=str(response.status_code)
+    )
+    return response
+
+# Errors from the analysis engine, raised by any route that analyzes audio
+@app.exception_handler(AnalysisQueueFull)
+async def analysis_queue_full(request: Request, exc: AnalysisQueueFull):
+    return JSONResponse({"detail": str(exc)}, status_code=503, headers={"Retry-After": "1"})
+
+@app.exception_handler(AnalysisTimeout)
+async def analysis_timeout(request: Request, exc: AnalysisTimeout):
+    return JSONResponse({"detail": str(exc)}, status_code=504)
+
+@app.exception_handler(AudioRejected)
+async def audio_rejected(request: Request, exc: AudioRejected):
+    return JSONResponse({"detail": str(exc)}, status_code=exc.status_code)
+
 # Include routers
 app.include_router(configuration.router)
 app.include_router(audio.router)
+app.include_router(metrics_routes.router)
+app.include_router(health.router)
+app.include_router(progress.router)
 
 @app.get("/")
 async def root():
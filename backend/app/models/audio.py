@@ -1,10 +1,13 @@
 from pydantic import BaseModel
-from typing import List, Tuple
+from typing import Dict, List, Tuple
+from .frames import FrameFeatures
+from .phoneme import PhonemeFeatures
 
 class FrequencyFeatures(BaseModel):
     fundamental: float
     spectrum: List[float]
     centroid: float
+    formants: List[float] | None = None  # F1-F3 in Hz
 
 class AmplitudeFeatures(BaseModel):
     envelope: List[float]
@@ -16,8 +19,71 @@ class AudioFeatures(BaseModel):
     durationRange: Tuple[float, float]
     centroid: float
     rms: float
+    formants: Tuple[float, float, float] | None = None
 
 class AudioAnalysisResponse(BaseModel):
     frequency_features: FrequencyFeatures
     amplitude_features: AmplitudeFeatures
-    similarity_score: float | None = None 
\ No newline at end of file
+    similarity_score: float | None = None 
+
+class FeatureValues(BaseModel):
+    """Whole-clip values of the features an analysis was asked for; the rest are None."""
+    duration: float
+    rms: float | None = None
+    centroid: float | None = None
+    fundamental: float | None = None
+    mfcc: List[float] | None = None  # Mean of each coefficient over the clip
+    formants: List[float] | None = None  # Median F1-F3 of voiced frames
+
+class FeatureSetResponse(FeatureValues):
+    envelope: List[float] | None = None  # With "rms"
+    spectrum: List[float] | None = None  # With "spectrum"
+
+class AnalysisResult(BaseModel):
+    """Features plus visualization arrays produced by one analysis job."""
+    features: PhonemeFeatures | None = None  # Only when the summary features were computed
+    values: FeatureValues | None = None
+    envelope: List[float] = []
+    spectrum: List[float] = []
+    frames: FrameFeatures | None = None  # Frame-level trajectories for DTW scoring
+    timings: Dict[str, float] = {}  # Seconds per stage, measured in the worker
+    peak_rss_bytes: int | None = None  # Worker memory high-water mark
+
+    class Config:
+        arbitrary_types_allowed = True
+
+class ReferenceMatch(BaseModel):
+    reference_id: str
+    language: str
+    symbol: str
+    similarity_score: float
+
+class MatchResponse(BaseModel):
+    matches: List[ReferenceMatch]
+
+class StreamingUpdate(BaseModel):
+    """Message pushed to clients of the streaming analysis WebSocket."""
+    type: str  # "partial" while audio arrives, "final" once the client ends the stream
+    time: float  # Seconds of audio received
+    rms: float  # Latest frame
+    centroid: float  # Latest frame
+    envelope: List[float]  # Frame RMS values since the previous message
+    similarity_score: float | None = None
+    features: PhonemeFeatures | None = None
+
+class BatchRecord(BaseModel):
+    """One row of batch scoring output; flat so it maps onto columnar formats."""
+    file: str
+    status: str  # "ok" or "error"
+    error: str | None = None
+    frequency_min: float | None = None
+    frequency_max: float | None = None
+    amplitude_min: float | None = None
+    amplitude_max: float | None = None
+    duration: float | None = None
+    centroid: float | None = None
+    rms: float | None = None
+    fundamental: float | None = None
+    reference_id: str | None = None  # Best-matching reference
+    symbol: str | None = None
+    similarity_score: float | None = None
@@ -0,0 +1,58 @@
+import os
+import numpy as np
+from pathlib import Path
+
+class FrameFeatures:
+    """Frame-level trajectories of one clip, as compact float32 arrays.
+
+    `rms` and `centroid` hold one value per STFT frame, `mfcc` one column
+    per frame and the optional `formants` one F1-F3 column per frame, NaN
+    where none were found. References keep these in an `.npz` file next to
+    their JSON rather than inside it.
+    """
+
+    def __init__(
+        self,
+        rms: np.ndarray,
+        centroid: np.ndarray,
+        mfcc: np.ndarray,
+        hop_seconds: float,
+        formants: np.ndarray | None = None
+    ):
+        self.rms = np.asarray(rms, dtype=np.float32)
+        self.centroid = np.asarray(centroid, dtype=np.float32)
+        self.mfcc = np.asarray(mfcc, dtype=np.float32)
+        self.hop_seconds = float(hop_seconds)
+        self.formants = None if formants is None else np.asarray(formants, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.rms)
+
+    def arrays(self) -> dict:
+        arrays = {
+            "rms": self.rms,
+            "centroid": self.centroid,
+            "mfcc": self.mfcc,
+            "hop_seconds": np.float32(self.hop_seconds)
+        }
+        if self.formants is not None:
+            arrays["formants"] = self.formants
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, data) -> "FrameFeatures":
+        # Files written before formant tracking have no formants
+        formants = data["formants"] if "formants" in data else None
+        return cls(data["rms"], data["centroid"], data["mfcc"], float(data["hop_seconds"]), formants)
+
+    def save(self, path: Path):
+        """Write atomically, so readers never see a partial file."""
+        temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with temp_path.open("wb") as f:
+            np.savez(f, **self.arrays())
+        temp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "FrameFeatures":
+        with np.load(path) as data:
+            return cls.from_arrays(data)
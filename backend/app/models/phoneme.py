@@ -1,10 +1,25 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, validator
 from typing import Optional, Tuple, List
 
+# Features the analysis engine can compute; see FeatureExtractor.extract
+FEATURE_NAMES = ("rms", "centroid", "spectrum", "f0", "mfcc", "formants")
+
+def _check_feature_names(names: Optional[List[str]]) -> Optional[List[str]]:
+    if names is not None:
+        unknown = sorted(set(names) - set(FEATURE_NAMES))
+        if unknown:
+            raise ValueError(f"Unknown features {unknown}, expected some of {FEATURE_NAMES}")
+    return names
+
 class PhonemeMetadata(BaseModel):
     language: str
     symbol: str
     description: Optional[str] = None
+    # Features computed for attempts at this phoneme on top of those summary
+    # scoring needs; None means the default set, which includes "f0" and "formants"
+    featureSet: Optional[List[str]] = None
+
+    _check_feature_set = validator("featureSet", allow_reuse=True)(_check_feature_names)
 
 class PhonemeFeatures(BaseModel):
     frequencyRange: Tuple[float, float]
@@ -12,6 +27,8 @@ class PhonemeFeatures(BaseModel):
     durationRange: Tuple[float, float]
     centroid: float
     rms: float
+    fundamental: Optional[float] = None  # Median F0 of voiced frames, Hz
+    formants: Optional[Tuple[float, float, float]] = None  # Median F1-F3 of voiced frames, Hz
 
 class FeedbackRules(BaseModel):
     thresholds: Tuple[float, float]
@@ -22,5 +39,22 @@ class PhonemeReference(BaseModel):
     language: str
     symbol: str
     audioPath: str
+    featureSet: Optional[List[str]] = None  # As in PhonemeMetadata
     features: Optional[PhonemeFeatures] = None
-    feedbackRules: Optional[FeedbackRules] = None 
\ No newline at end of file
+    feedbackRules: Optional[FeedbackRules] = None
+
+class ReferenceManifestEntry(PhonemeMetadata):
+    """One line of a bulk import manifest: an audio file in the archive and its phoneme."""
+    path: str
+    tolerance: Optional[float] = None  # Overrides the import-wide tolerance
+
+class BulkImportItem(BaseModel):
+    file: str
+    status: str  # "ok" or "error"
+    error: Optional[str] = None
+    reference: Optional[PhonemeReference] = None
+
+class BulkImportResponse(BaseModel):
+    imported: int
+    failed: int
+    items: List[BulkImportItem]
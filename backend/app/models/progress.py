@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class Attempt(BaseModel):
+    """One scored recording, as appended to the attempt log."""
+    timestamp: float  # Unix time
+    user_id: Optional[str] = None
+    reference_id: str
+    language: str
+    symbol: str
+    mode: str
+    similarity_score: Optional[float] = None
+    fundamental: Optional[float] = None
+    centroid: float
+    rms: float
+    duration: float
+
+class PhonemeProgress(BaseModel):
+    """Aggregates over one user's scored attempts at one phoneme."""
+    user_id: str
+    language: str
+    symbol: str
+    count: int
+    mean: float  # Over all attempts
+    rolling_mean: float  # Exponentially weighted, recent attempts count most
+    best: float
+    last: float
+    trend: float  # Weighted mean of each score minus the rolling mean before it; > 0 is improving
+    first_at: float
+    last_at: float
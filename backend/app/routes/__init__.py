@@ -1,2 +1,5 @@
 from . import configuration
-from . import audio 
\ No newline at end of file
+from . import audio
+from . import metrics
+from . import health
+from . import progress
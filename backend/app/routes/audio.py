@@ -1,92 +1,375 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from ..models.audio import AudioAnalysisResponse, FrequencyFeatures, AmplitudeFeatures, AudioFeatures
-from ..services.feature_extractor import FeatureExtractor
-from ..services.configuration_store import ConfigurationStore
-from pathlib import Path
+from fastapi import APIRouter, UploadFile, File, Header, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, StreamingResponse
+from typing import List, Optional
+import asyncio
+import time
 import numpy as np
-import librosa
+from ..models.progress import Attempt
+from ..models.audio import (
+    AudioAnalysisResponse, FrequencyFeatures, AmplitudeFeatures, AudioFeatures,
+    FeatureSetResponse, MatchResponse, ReferenceMatch, StreamingUpdate
+)
+from ..models.phoneme import FEATURE_NAMES
+from ..services.analysis_engine import AnalysisQueueFull, AnalysisTimeout
+from ..services.audio_decoder import AudioRejected
+from ..services.batch import BatchItem, build_record, iter_zip
+from ..services.feature_cache import FeatureCache
+from ..services.feature_extractor import COMPARISON_MODES, SUMMARY_FEATURES, scoring_features
+from ..services.metrics import timed
+from ..services.pitch import f0_range_around
+from ..services.reference_matrix import ReferenceMatrix
+from ..services.streaming_analyzer import StreamingAnalyzer
+from ..dependencies import analysis_engine, attempt_log, config_store, feature_extractor, result_cache
+from ..settings import settings
+from .formats import JSON_MEDIA_TYPE, binary_response, negotiate
+from .uploads import open_archive, read_upload
 
 router = APIRouter(prefix="/api/audio")
-feature_extractor = FeatureExtractor()
-config_store = ConfigurationStore(Path("data/configurations"))
+# Analysis errors are answered by the exception handlers in main.py
+PASS_THROUGH = (HTTPException, AnalysisQueueFull, AnalysisTimeout, AudioRejected)
+reference_matrix = ReferenceMatrix(config_store, feature_extractor)
 
 @router.post("/analyze")
-async def analyze_audio(file: UploadFile = File(...)) -> AudioAnalysisResponse:
-    """Analyze uploaded audio and compare with reference."""
-    temp_path = None
+async def analyze_audio(
+    file: UploadFile = File(...),
+    mode: str = Query("summary", regex=f"^({'|'.join(COMPARISON_MODES)})$"),
+    points: int = Query(settings.visualization_points, ge=2, le=settings.max_visualization_points),
+    user_id: Optional[str] = Query(None, max_length=200),
+    accept: Optional[str] = Header(None)
+) -> AudioAnalysisResponse:
+    """Analyze uploaded audio, compare it with the reference and log the attempt."""
+    media_type = negotiate(accept)
     try:
         if not file.content_type.startswith("audio/"):
             raise HTTPException(400, "File must be audio")
         
-        # Save temporary file
-        temp_path = Path("data/temp") / f"{file.filename}"
-        temp_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with temp_path.open("wb") as f:
-            content = await file.read()
-            f.write(content)
-        
-        # Load audio for envelope calculation
-        y, sr = librosa.load(str(temp_path), sr=22050)
-        
-        # Calculate real amplitude envelope
-        frame_length = 2048
-        hop_length = 512
-        rms = librosa.feature.rms(y=y, frame_length=frame_length, hop_length=hop_length)[0]
-        
-        # Normalize envelope to 0-1 range and take 100 points
-        envelope = librosa.util.normalize(rms)
-        envelope = librosa.resample(envelope, orig_sr=len(envelope), target_sr=100)
-        
-        # Extract features as AudioFeatures
-        features = await feature_extractor.extract_features(temp_path)
-        
-        # Get reference for comparison
-        references = config_store.list_references()
+        # Get reference for comparison; the version is read first, so any
+        # change from here on keeps the result out of the cache
+        store_version = config_store.version
+        references = await config_store.list_references_async()
         if not references:
             raise HTTPException(400, "No reference configuration found")
         
         reference = references[0]  # Use first reference for now
+        reference_frames = None
+        if mode == "dtw":
+            reference_frames = await config_store.get_frames_async(reference.id)
+            if reference_frames is None:
+                raise HTTPException(400, "Reference has no frame-level features, extract features again")
         
-        # Calculate similarity score
-        similarity_score = feature_extractor.calculate_similarity(
-            AudioFeatures(
-                frequencyRange=features.frequencyRange,
-                amplitudeRange=features.amplitudeRange,
-                durationRange=features.durationRange,
-                centroid=features.centroid,
-                rms=features.rms
-            ),
-            reference.features
-        ) if reference.features else None
+        # Decode and extract features on the analysis pool, off the event loop;
+        # only the features the reference asks for are computed, and the
+        # pitch search is narrowed around the reference's fundamental
+        feature_set = scoring_features(reference.featureSet)
+        with timed("upload_read"):
+            content = await read_upload(file, settings.max_upload_bytes)
+        
+        # Retried and replayed uploads skip analysis entirely, but still
+        # count as attempts, possibly by another user
+        cache_key = FeatureCache.key(content, {**feature_extractor.scoring_params(mode, feature_set), "points": points})
+        cached = result_cache.get(cache_key, reference.id)
+        if cached is not None:
+            response, attempt = cached
+            attempt_log.record(attempt.copy(update={"timestamp": time.time(), "user_id": user_id}))
+            return _encode(response, media_type)
+        
+        analysis = await analysis_engine.analyze(
+            content,
+            f0_range_around(reference.features.fundamental) if reference.features else None,
+            points,
+            feature_set,
+            frames=reference_frames is not None
+        )
+        features = analysis.features
         
-        # Calculate spectrum
-        D = np.abs(librosa.stft(y))
-        spectrum = np.mean(D, axis=1)
-        spectrum = librosa.util.normalize(spectrum)
-        spectrum = librosa.resample(spectrum, orig_sr=len(spectrum), target_sr=100)
+        # Calculate similarity score
+        if reference_frames is not None and analysis.frames is None:
+            raise HTTPException(
+                400, f"DTW scoring needs recordings under {settings.stream_analysis_after:g}s"
+            )
+        if reference_frames is not None:
+            similarity_score = feature_extractor.calculate_trajectory_similarity(
+                analysis.frames, reference_frames
+            )
+        else:
+            similarity_score = feature_extractor.calculate_similarity(
+                AudioFeatures(
+                    frequencyRange=features.frequencyRange,
+                    amplitudeRange=features.amplitudeRange,
+                    durationRange=features.durationRange,
+                    centroid=features.centroid,
+                    rms=features.rms,
+                    formants=features.formants
+                ),
+                reference.features
+            ) if reference.features else None
         
         # Convert features to response format
-        return AudioAnalysisResponse(
+        response = AudioAnalysisResponse(
             frequency_features=FrequencyFeatures(
-                fundamental=features.frequencyRange[0],
-                spectrum=spectrum.tolist(),  # Real spectrum data
-                centroid=features.centroid
+                fundamental=features.fundamental or 0.0,
+                spectrum=analysis.spectrum,  # Real spectrum data
+                centroid=features.centroid,
+                formants=list(features.formants) if features.formants else None
             ),
             amplitude_features=AmplitudeFeatures(
-                envelope=envelope.tolist(),  # Real envelope data
+                envelope=analysis.envelope,  # Real envelope data
                 rms=features.rms
             ),
             similarity_score=similarity_score
         )
         
+        attempt = Attempt(
+            timestamp=time.time(),
+            user_id=user_id,
+            reference_id=reference.id,
+            language=reference.language,
+            symbol=reference.symbol,
+            mode=mode,
+            similarity_score=similarity_score,
+            fundamental=features.fundamental,
+            centroid=features.centroid,
+            rms=features.rms,
+            duration=analysis.values.duration
+        )
+        attempt_log.record(attempt)
+        
+        # Skip caching if references changed while we were scoring
+        await asyncio.to_thread(config_store.refresh)
+        if config_store.version == store_version:
+            result_cache.put(cache_key, reference.id, (response, attempt))
+        return _encode(response, media_type)
+        
+    except PASS_THROUGH:
+        raise
     except Exception as e:
         print(f"Audio analysis error: {str(e)}")  # Log the error
         raise HTTPException(500, f"Analysis failed: {str(e)}")
-    finally:
-        # Cleanup
-        if temp_path and temp_path.exists():
+
+def _encode(response: AudioAnalysisResponse, media_type: str) -> AudioAnalysisResponse | Response:
+    # Returned as-is, the model goes through FastAPI's usual JSON serialization
+    if media_type == JSON_MEDIA_TYPE:
+        return response
+    with timed("response_encode"):
+        return binary_response(response, media_type)
+
+@router.post("/features")
+async def extract_audio_features(
+    file: UploadFile = File(...),
+    include: List[str] = Query(["rms", "spectrum"]),
+    points: int = Query(settings.visualization_points, ge=2, le=settings.max_visualization_points)
+) -> FeatureSetResponse:
+    """Compute only the listed features of an upload, without scoring it.
+
+    `include` takes any of rms, centroid, spectrum, f0, mfcc and formants
+    and can be repeated. Shared frames are computed once, and only for what is asked:
+    `include=rms` alone, e.g. for an envelope display, needs no STFT and no
+    pitch tracking. "rms" adds the envelope curve and "spectrum" the
+    spectrum curve, each `points` values long.
+    """
+    unknown = sorted(set(include) - set(FEATURE_NAMES))
+    if unknown:
+        raise HTTPException(400, f"Unknown features {unknown}, expected some of {list(FEATURE_NAMES)}")
+    try:
+        if not file.content_type.startswith("audio/"):
+            raise HTTPException(400, "File must be audio")
+        
+        with timed("upload_read"):
+            content = await read_upload(file, settings.max_upload_bytes)
+        analysis = await analysis_engine.analyze(content, None, points, frozenset(include), frames=False)
+        
+        return FeatureSetResponse(
+            **analysis.values.dict(),
+            envelope=analysis.envelope if "rms" in include else None,
+            spectrum=analysis.spectrum if "spectrum" in include else None
+        )
+        
+    except PASS_THROUGH:
+        raise
+    except Exception as e:
+        print(f"Feature extraction error: {str(e)}")
+        raise HTTPException(500, f"Feature extraction failed: {str(e)}")
+
+@router.post("/match")
+async def match_audio(
+    file: UploadFile = File(...),
+    language: Optional[str] = Query(None),
+    symbol: Optional[str] = Query(None),
+    top_k: int = Query(5, ge=1, le=100)
+) -> MatchResponse:
+    """Score uploaded audio against every configured reference and return the best matches."""
+    try:
+        if not file.content_type.startswith("audio/"):
+            raise HTTPException(400, "File must be audio")
+        
+        with timed("upload_read"):
+            content = await read_upload(file, settings.max_upload_bytes)
+        # Matching scores summary features and formants; skip pitch and trajectories
+        analysis = await analysis_engine.analyze(content, features=SUMMARY_FEATURES | {"formants"}, frames=False)
+        
+        # May refresh the store from storage, so keep it off the event loop
+        matches = await asyncio.to_thread(
+            reference_matrix.top_matches,
+            analysis.features,
+            top_k=top_k,
+            language=language,
+            symbol=symbol
+        )
+        
+        return MatchResponse(matches=[
+            ReferenceMatch(
+                reference_id=reference.id,
+                language=reference.language,
+                symbol=reference.symbol,
+                similarity_score=score
+            )
+            for reference, score in matches
+        ])
+        
+    except PASS_THROUGH:
+        raise
+    except Exception as e:
+        print(f"Audio match error: {str(e)}")
+        raise HTTPException(500, f"Match failed: {str(e)}")
+
+# Little-endian PCM sample formats accepted by the streaming endpoint
+STREAM_ENCODINGS = {"f32": ("<f4", 1.0), "s16": ("<i2", 1 / 32768)}
+# Longest audio one streamed message may hold; chunks are analyzed on the
+# event loop, so this bounds the work per message
+MAX_STREAM_CHUNK_SECONDS = 1.0
+
+def _stream_update(kind: str, analyzer: StreamingAnalyzer, reference) -> StreamingUpdate:
+    features = analyzer.features()
+    similarity_score = feature_extractor.calculate_similarity(
+        features, reference.features
+    ) if features and reference and reference.features else None
+    return StreamingUpdate(
+        type=kind,
+        time=analyzer.duration,
+        rms=analyzer.current_rms,
+        centroid=analyzer.current_centroid,
+        envelope=analyzer.drain_envelope(),
+        similarity_score=similarity_score,
+        features=features if kind == "final" else None
+    )
+
+@router.websocket("/stream")
+async def stream_audio(
+    websocket: WebSocket,
+    sample_rate: int = Query(22050, ge=8000, le=96000),
+    encoding: str = Query("f32"),
+    reference_id: Optional[str] = Query(None),
+    update_interval: float = Query(0.05, ge=0.01, le=1.0)
+):
+    """Analyze mono PCM chunks while the learner speaks.
+
+    Clients send binary messages of little-endian samples (`f32` or `s16`)
+    of at most MAX_STREAM_CHUNK_SECONDS each, and receive a "partial"
+    StreamingUpdate roughly every `update_interval` seconds of audio.
+    Sending the text message "end" returns a "final" update with whole-clip
+    features and closes the socket.
+    """
+    await websocket.accept()
+    
+    if encoding not in STREAM_ENCODINGS:
+        await websocket.close(code=1003, reason="Unsupported encoding")
+        return
+    dtype, scale = STREAM_ENCODINGS[encoding]
+    max_chunk_bytes = int(MAX_STREAM_CHUNK_SECONDS * sample_rate) * np.dtype(dtype).itemsize
+    
+    if reference_id:
+        reference = await config_store.get_reference_async(reference_id)
+        if not reference:
+            await websocket.close(code=1008, reason="Reference not found")
+            return
+    else:
+        references = await config_store.list_references_async()
+        reference = references[0] if references else None  # Same default as /analyze
+    
+    analyzer = StreamingAnalyzer(sample_rate, feature_extractor)
+    frames_per_update = max(1, round(update_interval * sample_rate / analyzer.hop_length))
+    frames_since_update = 0
+    
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            
+            if message.get("bytes") is not None:
+                if len(message["bytes"]) > max_chunk_bytes:
+                    await websocket.close(
+                        code=1009, reason=f"Chunk exceeds {MAX_STREAM_CHUNK_SECONDS:g}s of audio"
+                    )
+                    return
+                try:
+                    samples = np.frombuffer(message["bytes"], dtype=dtype) * scale
+                except ValueError:
+                    await websocket.close(code=1003, reason="Chunk is not whole samples")
+                    return
+                
+                frames_since_update += analyzer.push(samples)
+                if frames_since_update >= frames_per_update:
+                    frames_since_update = 0
+                    await websocket.send_text(_stream_update("partial", analyzer, reference).json())
+            
+            elif message.get("text") == "end":
+                # The trailing frames overlap the end of the audio; without
+                # them the final features would differ from offline analysis
+                analyzer.flush()
+                await websocket.send_text(_stream_update("final", analyzer, reference).json())
+                await websocket.close()
+                return
+    
+    except WebSocketDisconnect:
+        return
+
+@router.post("/batch")
+async def batch_analyze(
+    file: UploadFile = File(...),
+    language: Optional[str] = Query(None),
+    symbol: Optional[str] = Query(None)
+) -> StreamingResponse:
+    """Score every audio file in an uploaded zip archive.
+
+    Records stream back as JSONL in completion order; the X-Batch-Total
+    header gives the number of files so clients can report progress.
+    """
+    archive = open_archive(file, settings.max_upload_bytes, settings.max_archive_bytes)
+    items = list(iter_zip(archive))
+    
+    slots = asyncio.Semaphore(analysis_engine.max_workers)
+    
+    async def score(item: BatchItem) -> str:
+        async with slots:
             try:
-                temp_path.unlink()
+                # Decompressing a member and matching may both hit the disk
+                content = await asyncio.to_thread(item.read)
+                analysis = await analysis_engine.analyze(content, frames=False, wait=True)
             except Exception as e:
-                print(f"Failed to cleanup temp file: {str(e)}")
\ No newline at end of file
+                return build_record(item.name, error=str(e)).json()
+        
+        matches = await asyncio.to_thread(
+            reference_matrix.top_matches,
+            analysis.features,
+            top_k=1,
+            language=language,
+            symbol=symbol
+        )
+        return build_record(item.name, analysis, matches[0] if matches else None).json()
+    
+    async def stream():
+        tasks = [asyncio.create_task(score(item)) for item in items]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+            archive.close()
+    
+    return StreamingResponse(
+        stream(),
+        media_type="application/x-ndjson",
+        headers={"X-Batch-Total": str(len(items))}
+    )
@@ -1,28 +1,56 @@
+import asyncio
 from fastapi import APIRouter, UploadFile, File, HTTPException, Form
-from typing import Dict
+from typing import Dict, FrozenSet, Optional, Tuple
 from uuid import uuid4
 from pathlib import Path
 import json
-import shutil
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 
-from ..models.phoneme import PhonemeMetadata, PhonemeReference, PhonemeFeatures
-from ..services.feature_extractor import FeatureExtractor
-from ..services.configuration_store import ConfigurationStore
+from ..models.phoneme import (
+    PhonemeMetadata, PhonemeReference, PhonemeFeatures,
+    BulkImportItem, BulkImportResponse, ReferenceManifestEntry
+)
+from ..models.audio import AnalysisResult
+from ..services.analysis_engine import AnalysisTimeout
+from ..services.audio_decoder import AudioRejected
+from ..services.batch import AUDIO_EXTENSIONS, read_archive_manifest
+from ..services.feature_extractor import DEFAULT_FEATURES, scoring_features
+from ..dependencies import analysis_engine, config_store, feature_extractor, feature_cache
+from ..settings import settings
+from .uploads import open_archive, save_upload
 
 router = APIRouter(prefix="/api/config")
-feature_extractor = FeatureExtractor()
-config_store = ConfigurationStore(Path("data/configurations"))
 
 class SetParametersRequest(BaseModel):
     tolerance: float
 
+async def analyze_reference_audio(
+    content: bytes,
+    features: FrozenSet[str] = DEFAULT_FEATURES,
+    wait: bool = False
+) -> AnalysisResult:
+    """Analyze reference audio, reusing cached features for identical content.
+
+    With `wait`, a full analysis queue is waited out instead of raising
+    `AnalysisQueueFull`.
+    """
+    key = feature_cache.key(content, {**feature_extractor.cache_params(), "features": sorted(features)})
+    # Loading and compressing entries is disk I/O, kept off the event loop
+    analysis = await asyncio.to_thread(feature_cache.get, key)
+    if analysis is not None:
+        return analysis
+
+    analysis = await analysis_engine.analyze(content, features=features, wait=wait)
+
+    await asyncio.to_thread(feature_cache.put, key, analysis)
+    return analysis
+
 @router.get("/status")
 async def check_configuration() -> Dict[str, bool]:
     """Check if the system has been configured with reference data."""
     try:
         # Get all references
-        references = list(config_store._references.values())
+        references = await config_store.list_references_async()
         
         # Check if we have any fully configured references
         configured_refs = [
@@ -57,30 +85,34 @@ async def upload_reference(
     
     audio_path.parent.mkdir(parents=True, exist_ok=True)
     
-    with audio_path.open("wb") as f:
-        shutil.copyfileobj(audio.file, f)
+    await save_upload(audio, audio_path, settings.max_upload_bytes)
     
     reference = PhonemeReference(
         id=reference_id,
         language=phoneme_metadata.language,
         symbol=phoneme_metadata.symbol,
-        audioPath=str(audio_path)
+        audioPath=str(audio_path),
+        featureSet=phoneme_metadata.featureSet
     )
     
-    config_store.save_reference(reference)
+    await config_store.save_reference_async(reference)
     
     return reference
 
 @router.post("/extract-features/{reference_id}")
 async def extract_features(reference_id: str) -> PhonemeReference:
-    reference = config_store.get_reference(reference_id)
+    reference = await config_store.get_reference_async(reference_id)
     if not reference:
         raise HTTPException(404, "Reference not found")
     
-    features = await feature_extractor.extract_features(Path(reference.audioPath))
-    reference.features = features
+    content = await asyncio.to_thread(Path(reference.audioPath).read_bytes)
+    analysis = await analyze_reference_audio(content, scoring_features(reference.featureSet))
+    # A new object, so readers holding the indexed one never see it half-updated
+    reference = reference.copy(update={"features": analysis.features})
     
-    config_store.save_reference(reference)
+    if analysis.frames is not None:
+        await config_store.save_frames_async(reference.id, analysis.frames)
+    await config_store.save_reference_async(reference)
     return reference
 
 @router.post("/set-parameters/{reference_id}")
@@ -88,7 +120,7 @@ async def set_parameters(
     reference_id: str,
     request: SetParametersRequest
 ) -> PhonemeReference:
-    reference = config_store.get_reference(reference_id)
+    reference = await config_store.get_reference_async(reference_id)
     if not reference:
         raise HTTPException(404, "Reference not found")
     
@@ -96,10 +128,106 @@ async def set_parameters(
         raise HTTPException(400, "Features must be extracted first")
     
     # Apply tolerance to create acceptable ranges
-    reference.features = feature_extractor.calculate_ranges(
+    reference = reference.copy(update={"features": feature_extractor.calculate_ranges(
         reference.features,
         request.tolerance
-    )
+    )})
     
-    config_store.save_reference(reference)
-    return reference 
\ No newline at end of file
+    await config_store.save_reference_async(reference)
+    return reference
+
+@router.post("/references/bulk")
+async def bulk_import_references(
+    archive: UploadFile = File(...),
+    tolerance: Optional[float] = Form(None)
+) -> BulkImportResponse:
+    """Create references for every file listed in an archive's manifest.
+
+    The zip holds audio files plus a manifest (see
+    `batch.read_archive_manifest`) with `path`, `language`, `symbol` and
+    optionally `description` and `tolerance` per file. Features are
+    extracted concurrently on the analysis pool, the tolerance (per entry,
+    else the `tolerance` field) is applied to each result, and all successful
+    references are saved in one batch. Failed entries are reported per item
+    and do not stop the others.
+    """
+    with open_archive(archive, settings.max_upload_bytes, settings.max_archive_bytes) as zf:
+        try:
+            base, rows = read_archive_manifest(zf)
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+        members = {info.filename: info for info in zf.infolist() if not info.is_dir()}
+
+        slots = asyncio.Semaphore(analysis_engine.max_workers)
+
+        async def import_one(row) -> Tuple[BulkImportItem, Optional[Path]]:
+            name = str(row.get("path", "")) if isinstance(row, dict) else ""
+            audio_path = None
+            try:
+                entry = ReferenceManifestEntry.parse_obj(row)
+                info = members.get(base + entry.path)
+                if info is None:
+                    raise ValueError(f"{entry.path} is not in the archive")
+                suffix = Path(entry.path).suffix.lower()
+                if suffix not in AUDIO_EXTENSIONS:
+                    raise ValueError(f"{entry.path} is not an audio file")
+
+                async with slots:
+                    content = await asyncio.to_thread(zf.read, info)
+                    analysis = await analyze_reference_audio(
+                        content, scoring_features(entry.featureSet), wait=True
+                    )
+
+                features = analysis.features
+                entry_tolerance = entry.tolerance if entry.tolerance is not None else tolerance
+                if entry_tolerance is not None:
+                    features = feature_extractor.calculate_ranges(features, entry_tolerance)
+
+                reference_id = str(uuid4())
+                audio_path = Path("data/reference_audio") / f"{reference_id}{suffix}"
+                await asyncio.to_thread(audio_path.write_bytes, content)
+                if analysis.frames is not None:
+                    await config_store.save_frames_async(reference_id, analysis.frames)
+                reference = PhonemeReference(
+                    id=reference_id,
+                    language=entry.language,
+                    symbol=entry.symbol,
+                    audioPath=str(audio_path),
+                    featureSet=entry.featureSet,
+                    features=features
+                )
+                return BulkImportItem(file=name, status="ok", reference=reference), audio_path
+            except ValidationError as e:
+                error = f"Invalid manifest entry: {e}"
+            except (AnalysisTimeout, AudioRejected, ValueError) as e:
+                error = str(e)
+            except Exception as e:
+                print(f"Reference import error for {name}: {str(e)}")
+                error = f"Feature extraction failed: {str(e)}"
+            if audio_path is not None:
+                audio_path.unlink(missing_ok=True)
+            return BulkImportItem(file=name, status="error", error=error), None
+
+        Path("data/reference_audio").mkdir(parents=True, exist_ok=True)
+        results = await asyncio.gather(*(import_one(row) for row in rows))
+
+    items = [item for item, _ in results]
+    references = [item.reference for item in items if item.reference is not None]
+    try:
+        await config_store.save_references_async(references)
+    except Exception as e:
+        def clean_up():
+            for item, audio_path in results:
+                if audio_path is not None:
+                    audio_path.unlink(missing_ok=True)
+                if item.reference is not None:
+                    config_store.delete_frames(item.reference.id)
+
+        await asyncio.to_thread(clean_up)
+        raise HTTPException(500, f"Failed to save references: {str(e)}")
+
+    return BulkImportResponse(
+        imported=len(references),
+        failed=len(items) - len(references),
+        items=items
+    )
@@ -0,0 +1,105 @@
+"""Binary encodings of `AudioAnalysisResponse`, chosen by the Accept header.
+
+JSON stays the default. The binary formats carry the spectrum and envelope
+as little-endian float32 buffers instead of lists of decimal numbers:
+
+- `application/msgpack`: the same structure as the JSON response, with the
+  two arrays as MessagePack bin values. Requires the optional msgpack
+  package; without it, msgpack is never negotiated.
+- `application/octet-stream`: a 10-byte header (magic `b"SPCH"`, uint16
+  format version, uint32 length of a UTF-8 JSON header), the JSON header
+  with the scalar fields and array lengths, then the arrays back to back.
+"""
+import importlib.util
+import json
+import struct
+from functools import lru_cache
+from typing import Optional
+import numpy as np
+from fastapi.responses import Response
+from ..models.audio import AudioAnalysisResponse
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+RAW_MEDIA_TYPE = "application/octet-stream"
+
+RAW_MAGIC = b"SPCH"
+RAW_VERSION = 1
+RAW_HEADER = struct.Struct("<4sHI")
+
+@lru_cache(maxsize=1)
+def msgpack_available() -> bool:
+    # Looks the package up without importing it
+    return importlib.util.find_spec("msgpack") is not None
+
+def negotiate(accept: Optional[str]) -> str:
+    """Media type to respond with: the client's most preferred one we support."""
+    if not accept:
+        return JSON_MEDIA_TYPE
+    ranges = []
+    for position, item in enumerate(accept.split(",")):
+        media_type, *params = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            ranges.append((-quality, position, media_type.lower()))
+
+    for _, _, media_type in sorted(ranges):
+        if media_type in MSGPACK_MEDIA_TYPES and msgpack_available():
+            return media_type
+        if media_type == RAW_MEDIA_TYPE:
+            return media_type
+        if media_type in (JSON_MEDIA_TYPE, "application/*", "*/*"):
+            return JSON_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+def _float32_bytes(values) -> bytes:
+    return np.asarray(values, dtype="<f4").tobytes()
+
+def encode_msgpack(response: AudioAnalysisResponse) -> bytes:
+    """Only called when `negotiate()` chose msgpack, so the package is installed."""
+    import msgpack
+    frequency = response.frequency_features
+    amplitude = response.amplitude_features
+    return msgpack.packb({
+        "frequency_features": {
+            "fundamental": frequency.fundamental,
+            "spectrum": _float32_bytes(frequency.spectrum),
+            "centroid": frequency.centroid,
+            "formants": frequency.formants
+        },
+        "amplitude_features": {
+            "envelope": _float32_bytes(amplitude.envelope),
+            "rms": amplitude.rms
+        },
+        "similarity_score": response.similarity_score
+    })
+
+def encode_raw(response: AudioAnalysisResponse) -> bytes:
+    frequency = response.frequency_features
+    amplitude = response.amplitude_features
+    header = json.dumps({
+        "fundamental": frequency.fundamental,
+        "centroid": frequency.centroid,
+        "formants": frequency.formants,
+        "rms": amplitude.rms,
+        "similarity_score": response.similarity_score,
+        "arrays": [["spectrum", len(frequency.spectrum)], ["envelope", len(amplitude.envelope)]]
+    }, separators=(",", ":")).encode("utf-8")
+    return b"".join((
+        RAW_HEADER.pack(RAW_MAGIC, RAW_VERSION, len(header)),
+        header,
+        _float32_bytes(frequency.spectrum),
+        _float32_bytes(amplitude.envelope)
+    ))
+
+def binary_response(response: AudioAnalysisResponse, media_type: str) -> Response:
+    """Encode `response` as a binary media type returned by `negotiate()`."""
+    content = encode_raw(response) if media_type == RAW_MEDIA_TYPE else encode_msgpack(response)
+    return Response(content, media_type=media_type, headers={"Vary": "Accept"})
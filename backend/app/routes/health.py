@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+router = APIRouter()
+
+@router.get("/ready")
+async def readiness(request: Request):
+    """Readiness probe: 503 until startup warm-up has finished."""
+    if not getattr(request.app.state, "ready", False):
+        return JSONResponse({"ready": False}, status_code=503)
+    return {"ready": True}
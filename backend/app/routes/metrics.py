@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from ..services.metrics import metrics, peak_rss_bytes
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Counters, gauges and stage latency histograms for Prometheus."""
+    rss = peak_rss_bytes()
+    if rss is not None:
+        metrics.max_gauge("api_peak_rss_bytes", rss)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,24 @@
+import asyncio
+from fastapi import APIRouter, Query
+from typing import List, Optional
+from ..models.progress import Attempt, PhonemeProgress
+from ..dependencies import attempt_log
+
+router = APIRouter(prefix="/api/progress")
+
+@router.get("/{user_id}")
+async def get_progress(
+    user_id: str,
+    language: Optional[str] = Query(None),
+    symbol: Optional[str] = Query(None)
+) -> List[PhonemeProgress]:
+    """Per-phoneme progress of a user, read from incrementally kept aggregates."""
+    return await asyncio.to_thread(attempt_log.progress, user_id, language, symbol)
+
+@router.get("/{user_id}/attempts")
+async def get_attempts(
+    user_id: str,
+    limit: int = Query(50, ge=1, le=1000)
+) -> List[Attempt]:
+    """A user's most recent attempts, newest first."""
+    return await asyncio.to_thread(attempt_log.attempts, user_id, limit)
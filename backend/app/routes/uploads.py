@@ -0,0 +1,76 @@
+import os
+import zipfile
+from fastapi import HTTPException, UploadFile
+from pathlib import Path
+from typing import List
+
+# Uploads are copied in pieces of this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(413, f"Upload exceeds the {max_bytes // (1024 * 1024)} MB limit")
+
+async def read_upload(file: UploadFile, max_bytes: int) -> bytes:
+    """Read an upload in chunks, refusing it as soon as it exceeds `max_bytes`."""
+    if file.size is not None and file.size > max_bytes:
+        raise _too_large(max_bytes)
+
+    chunks: List[bytes] = []
+    total = 0
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        total += len(chunk)
+        if total > max_bytes:
+            raise _too_large(max_bytes)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+def open_archive(file: UploadFile, max_bytes: int, max_total_bytes: int) -> zipfile.ZipFile:
+    """Open an uploaded zip after checking its size and its members' declared sizes.
+
+    The archive itself and each member may be at most `max_bytes`, and all
+    members together at most `max_total_bytes` decompressed. Nothing is
+    decompressed before these checks; reading a member never yields more
+    than its declared size, so they also hold for archives that lie.
+    """
+    size = file.size
+    if size is None:
+        size = file.file.seek(0, os.SEEK_END)
+    if size > max_bytes:
+        raise _too_large(max_bytes)
+    file.file.seek(0)
+    if not zipfile.is_zipfile(file.file):
+        raise HTTPException(400, "File must be a zip archive")
+    file.file.seek(0)
+
+    archive = zipfile.ZipFile(file.file)
+    total = 0
+    for info in archive.infolist():
+        if info.file_size > max_bytes:
+            archive.close()
+            raise HTTPException(
+                413, f"Archive member {info.filename} exceeds the {max_bytes // (1024 * 1024)} MB limit"
+            )
+        total += info.file_size
+    if total > max_total_bytes:
+        archive.close()
+        raise HTTPException(
+            413, f"Archive contents exceed the {max_total_bytes // (1024 * 1024)} MB limit"
+        )
+    return archive
+
+async def save_upload(file: UploadFile, path: Path, max_bytes: int):
+    """Copy an upload to `path` in chunks, removing it if it exceeds `max_bytes`."""
+    if file.size is not None and file.size > max_bytes:
+        raise _too_large(max_bytes)
+
+    total = 0
+    try:
+        with path.open("wb") as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                total += len(chunk)
+                if total > max_bytes:
+                    raise _too_large(max_bytes)
+                f.write(chunk)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
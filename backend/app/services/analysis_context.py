@@ -0,0 +1,147 @@
+import numpy as np
+import librosa
+from functools import lru_cache
+from pathlib import Path
+from .audio_decoder import AudioDecoder
+from .formants import lpc_formants
+from .metrics import timed
+
+# Default length of the envelope and spectrum curves sent for visualization
+VISUALIZATION_POINTS = 100
+
+@lru_cache(maxsize=8)
+def _mel_basis(sr: int, n_fft: int) -> np.ndarray:
+    # Building the filterbank costs more than applying it to a short clip
+    return librosa.filters.mel(sr=sr, n_fft=n_fft)
+
+class AnalysisContext:
+    """Decoded audio plus the frame-level data every feature is derived from.
+
+    The STFT magnitude and RMS frames are computed once, on first use, and
+    shared by the envelope, spectrum, centroid, formant and range calculations.
+    """
+
+    def __init__(self, y: np.ndarray, sr: int, n_fft: int = 2048, hop_length: int = 512):
+        self.y = y
+        self.sr = sr
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self._magnitude: np.ndarray | None = None
+        self._rms: np.ndarray | None = None
+        self._centroid: np.ndarray | None = None
+        self._formants: np.ndarray | None = None
+
+    @classmethod
+    def from_bytes(
+        cls,
+        content: bytes,
+        decoder: AudioDecoder | None = None,
+        n_fft: int = 2048,
+        hop_length: int = 512
+    ) -> "AnalysisContext":
+        """Decode audio held in memory, without writing it to disk."""
+        y, sr = (decoder or AudioDecoder()).decode(content)
+        return cls(y, sr, n_fft, hop_length)
+
+    @classmethod
+    def from_path(
+        cls,
+        audio_path: Path,
+        decoder: AudioDecoder | None = None,
+        n_fft: int = 2048,
+        hop_length: int = 512
+    ) -> "AnalysisContext":
+        """Decode an audio file from disk."""
+        y, sr = (decoder or AudioDecoder()).decode_path(audio_path)
+        return cls(y, sr, n_fft, hop_length)
+
+    @property
+    def duration(self) -> float:
+        return float(len(self.y) / self.sr)
+
+    @property
+    def magnitude(self) -> np.ndarray:
+        """STFT magnitude, shape (1 + n_fft // 2, frames)."""
+        if self._magnitude is None:
+            with timed("stft"):
+                self._magnitude = np.abs(librosa.stft(self.y, n_fft=self.n_fft, hop_length=self.hop_length))
+        return self._magnitude
+
+    @property
+    def rms(self) -> np.ndarray:
+        """Frame-level RMS energy."""
+        if self._rms is None:
+            with timed("rms"):
+                self._rms = librosa.feature.rms(
+                    y=self.y,
+                    frame_length=self.n_fft,
+                    hop_length=self.hop_length
+                )[0]
+        return self._rms
+
+    @property
+    def centroid(self) -> np.ndarray:
+        """Frame-level spectral centroid in Hz."""
+        if self._centroid is None:
+            magnitude = self.magnitude
+            with timed("centroid"):
+                self._centroid = librosa.feature.spectral_centroid(
+                    S=magnitude,
+                    sr=self.sr,
+                    n_fft=self.n_fft,
+                    hop_length=self.hop_length
+                )[0]
+        return self._centroid
+
+    @property
+    def formants(self) -> np.ndarray:
+        """Frame-level F1-F3 in Hz from LPC, shape (3, frames), NaN where not found."""
+        if self._formants is None:
+            magnitude = self.magnitude
+            with timed("formants"):
+                self._formants = lpc_formants(magnitude, self.sr, self.n_fft)
+        return self._formants
+
+    def trimmed(self, threshold_db: float = 40.0, padding: float = 0.1) -> "AnalysisContext":
+        """Context cut to the voiced region, found from the RMS frames.
+
+        Frames within `threshold_db` of the loudest frame count as voiced;
+        the cut keeps `padding` seconds around the first and last of them.
+        The samples are a view, so only the shorter signal is analyzed
+        further. Returns self when there is nothing to trim.
+        """
+        rms = self.rms
+        if len(rms) == 0 or rms.max() <= 0:
+            return self
+        with timed("trim"):
+            voiced = np.flatnonzero(rms >= rms.max() * 10 ** (-threshold_db / 20))
+            pad = int(padding * self.sr)
+            # Frame i is centered on sample i * hop_length
+            start = max(0, voiced[0] * self.hop_length - pad)
+            end = min(len(self.y), voiced[-1] * self.hop_length + pad)
+        if start == 0 and end == len(self.y):
+            return self
+        return AnalysisContext(self.y[start:end], self.sr, self.n_fft, self.hop_length)
+
+    def spectral_centroid(self) -> float:
+        """Mean spectral centroid over all frames."""
+        return float(self.centroid.mean())
+
+    def mfcc(self, n_mfcc: int = 13) -> np.ndarray:
+        """MFCCs from the shared STFT, shape (n_mfcc, frames)."""
+        magnitude = self.magnitude
+        with timed("mfcc"):
+            mel = _mel_basis(self.sr, self.n_fft) @ magnitude ** 2
+            return librosa.feature.mfcc(S=librosa.power_to_db(mel), n_mfcc=n_mfcc)
+
+    def envelope(self, points: int = VISUALIZATION_POINTS) -> np.ndarray:
+        """RMS envelope normalized to 0-1 and resampled to `points` values."""
+        return normalized_curve(self.rms, points)
+
+    def spectrum(self, points: int = VISUALIZATION_POINTS) -> np.ndarray:
+        """Average magnitude spectrum normalized to 0-1 and resampled to `points` values."""
+        return normalized_curve(self.magnitude.mean(axis=1), points)
+
+def normalized_curve(values: np.ndarray, points: int = VISUALIZATION_POINTS) -> np.ndarray:
+    """Peak-normalize and resample to `points` values for visualization."""
+    return librosa.resample(librosa.util.normalize(values), orig_sr=len(values), target_sr=points)
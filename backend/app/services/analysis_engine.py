@@ -0,0 +1,351 @@
+import asyncio
+import io
+import logging
+import os
+import random
+import time
+import numpy as np
+import soundfile as sf
+from collections import deque
+from typing import Deque, FrozenSet, Iterable, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from ..models.audio import AnalysisResult, FeatureValues
+from .analysis_context import VISUALIZATION_POINTS, AnalysisContext, normalized_curve
+from .feature_extractor import DEFAULT_FEATURES, SUMMARY_FEATURES, FeatureExtractor
+from .metrics import collect_timings, metrics, peak_rss_bytes, record_timings, run_profiled, timed
+from .streaming_analyzer import StreamingAnalyzer
+
+logger = logging.getLogger(__name__)
+
+# Decoded audio held at once when analyzing long recordings block by block
+STREAM_BLOCK_SECONDS = 1.0
+
+# One extractor per worker process, installed by the pool initializer
+_worker_extractor: FeatureExtractor | None = None
+
+# Synthetic clip used for warm-up: a voiced tone between short silences, at a
+# rate that needs resampling, so every stage of the pipeline runs once
+WARM_UP_SAMPLE_RATE = 44100
+
+def warm_up_clip(sample_rate: int = WARM_UP_SAMPLE_RATE) -> bytes:
+    t = np.arange(sample_rate // 2) / sample_rate
+    tone = 0.3 * np.sin(2 * np.pi * 150 * t) + 0.1 * np.sin(2 * np.pi * 300 * t)
+    silence = np.zeros(sample_rate // 4)
+    buffer = io.BytesIO()
+    sf.write(buffer, np.concatenate([silence, tone, silence]).astype(np.float32), sample_rate, format="WAV")
+    return buffer.getvalue()
+
+def init_worker(feature_extractor: FeatureExtractor, warm_up: bool = False):
+    """Pool initializer: configure the extractor used by this worker process.
+
+    With `warm_up`, a synthetic clip runs through the full analysis before
+    the worker takes jobs, so lazy librosa imports and numba compilation
+    are paid here rather than by the first request.
+    """
+    global _worker_extractor
+    _worker_extractor = feature_extractor
+    if warm_up:
+        started = time.perf_counter()
+        analyze_bytes(warm_up_clip())
+        logger.info(f"Worker {os.getpid()} warmed up in {time.perf_counter() - started:.2f}s")
+
+# Each warm-up job keeps its worker busy this long, so workers that are
+# ready first leave some jobs to those still in their initializer
+WARM_UP_HOLD = 0.05
+
+def worker_pid(hold: float = 0.0) -> int:
+    time.sleep(hold)
+    return os.getpid()
+
+def analyze_bytes(
+    content: bytes,
+    f0_range: Optional[Tuple[float, float]] = None,
+    points: int = VISUALIZATION_POINTS,
+    features: Iterable[str] = DEFAULT_FEATURES,
+    frames: bool = True
+) -> AnalysisResult:
+    """Run the analysis for one upload inside a worker process.
+
+    Only `features` are computed (see `FeatureExtractor.extract`); the
+    summary features are filled in when they include SUMMARY_FEATURES, and
+    the envelope and spectrum curves, resampled to `points` values, with
+    "rms" and "spectrum". `frames` adds the trajectories for DTW scoring.
+    """
+    global _worker_extractor
+    if _worker_extractor is None:
+        _worker_extractor = FeatureExtractor()
+
+    extractor = _worker_extractor
+    features = frozenset(features)
+    with collect_timings() as timings:
+        info = extractor.decoder.probe(content)
+        if (extractor.stream_after is not None and info is not None
+                and info.duration > extractor.stream_after):
+            result = _analyze_streamed(content, extractor, features, f0_range, points)
+        else:
+            context = extractor.trim(AnalysisContext.from_bytes(
+                content, extractor.decoder, extractor.n_fft, extractor.hop_length
+            ))
+            values = extractor.extract(context, features, f0_range)
+            result = AnalysisResult(
+                features=extractor.summarize_values(values, context) if SUMMARY_FEATURES <= features else None,
+                values=FeatureValues(
+                    duration=context.duration,
+                    rms=values.get("rms"),
+                    centroid=values.get("centroid"),
+                    fundamental=values.get("fundamental"),
+                    mfcc=values["mfcc"].tolist() if "mfcc" in values else None,
+                    formants=values.get("formants")
+                ),
+                frames=extractor.extract_frames(context, "formants" in features) if frames else None
+            )
+            with timed("visualization"):
+                if "rms" in features:
+                    result.envelope = context.envelope(points).tolist()
+                if "spectrum" in features:
+                    result.spectrum = context.spectrum(points).tolist()
+
+    result.timings = timings
+    result.peak_rss_bytes = peak_rss_bytes()
+    return result
+
+def _analyze_streamed(
+    content: bytes,
+    extractor: FeatureExtractor,
+    features: FrozenSet[str],
+    f0_range: Optional[Tuple[float, float]] = None,
+    points: int = VISUALIZATION_POINTS
+) -> AnalysisResult:
+    """Analyze long recordings block by block, in memory independent of their length.
+
+    Gives the same features as the in-memory path, except that the
+    fundamental always comes from the autocorrelation tracker and MFCCs,
+    formants and frame-level trajectories are not produced. RMS, centroid and spectrum
+    cost little per block and are always computed, but only returned when
+    requested.
+    """
+    analyzer = StreamingAnalyzer(
+        extractor.sample_rate, extractor, keep_frames=True,
+        f0_range=f0_range, track_f0="f0" in features
+    )
+    with timed("stream_analysis"):
+        for block in extractor.decoder.stream(content, STREAM_BLOCK_SECONDS):
+            analyzer.push(block)
+            analyzer.drain_envelope()  # Only used live; keep it from growing
+        analyzer.flush()
+
+    summary = analyzer.features()
+    result = AnalysisResult(
+        features=summary if SUMMARY_FEATURES <= features else None,
+        values=FeatureValues(
+            duration=analyzer.duration,
+            rms=summary.rms if summary and "rms" in features else None,
+            centroid=summary.centroid if summary and "centroid" in features else None,
+            fundamental=summary.fundamental if summary else None
+        )
+    )
+    with timed("visualization"):
+        if "rms" in features:
+            result.envelope = normalized_curve(analyzer.rms_frames, points).tolist()
+        if "spectrum" in features:
+            result.spectrum = normalized_curve(analyzer.spectrum, points).tolist()
+    return result
+
+class AnalysisQueueFull(Exception):
+    """Raised when every worker is busy and the wait queue is at capacity."""
+
+class AnalysisTimeout(Exception):
+    """Raised when a job does not finish within the configured timeout."""
+
+class AnalysisEngine:
+    """Runs CPU-bound audio analysis on a process pool.
+
+    Async callers await `analyze()` without blocking the event loop. At most
+    `max_workers + max_queue` jobs are accepted at once; further submissions
+    fail fast with `AnalysisQueueFull` so the API can answer 503, or with
+    `wait=True` wait for a free slot, as bulk jobs do.
+    """
+
+    def __init__(
+        self,
+        feature_extractor: FeatureExtractor,
+        max_workers: int | None = None,
+        max_queue: int = 16,
+        timeout: float = 30.0,
+        profile_sample_rate: float = 0.0,
+        profile_dir: str | None = None,
+        profile_min_seconds: float = 1.0,
+        warm_up: bool = False
+    ):
+        self.feature_extractor = feature_extractor
+        # Each worker process analyzes a synthetic clip before taking jobs
+        self.warm_up_workers = warm_up
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.timeout = timeout
+        # A sampled fraction of jobs runs under cProfile; slow ones are saved
+        self.profile_sample_rate = profile_sample_rate if profile_dir else 0.0
+        self.profile_dir = profile_dir
+        self.profile_min_seconds = profile_min_seconds
+        self._executor: ProcessPoolExecutor | None = None
+        self._in_flight = 0
+        # Submissions with wait=True blocked on a full queue, oldest first
+        self._waiters: Deque[asyncio.Future] = deque()
+
+        metrics.set_gauge("analysis_in_flight", lambda: self.in_flight)
+        metrics.set_gauge("analysis_queue_depth", lambda: self.queue_depth)
+        metrics.set_gauge("analysis_workers", self.max_workers)
+
+    @property
+    def in_flight(self) -> int:
+        """Jobs submitted to the pool and not yet finished, running or waiting."""
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs waiting for a free worker."""
+        return max(0, self._in_flight - self.max_workers)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Created lazily so importing the app never forks worker processes
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=init_worker,
+                initargs=(self.feature_extractor, self.warm_up_workers)
+            )
+            logger.info(f"Started analysis pool with {self.max_workers} workers")
+        return self._executor
+
+    async def warm_up(self) -> float:
+        """Start every worker process and wait until all have warmed up.
+
+        Returns the elapsed seconds. A job only runs after its worker's
+        initializer, and a worker that is ready early may take several, so
+        jobs are resubmitted until every worker has reported its pid. Workers
+        replacing a broken pool warm up again in their initializer, but
+        nothing waits for them.
+        """
+        started = time.perf_counter()
+        executor = self._get_executor()
+
+        def submit():
+            return asyncio.wrap_future(executor.submit(worker_pid, WARM_UP_HOLD))
+
+        # One job per worker: none is idle yet, so each submission starts a process
+        pending = {submit() for _ in range(self.max_workers)}
+        pids = set()
+        try:
+            while len(pids) < self.max_workers:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pids.update(future.result() for future in done)
+                if len(pids) < self.max_workers:
+                    pending |= {submit() for _ in done}
+        finally:
+            for future in pending:
+                future.cancel()
+        return time.perf_counter() - started
+
+    async def analyze(
+        self,
+        content: bytes,
+        f0_range: Optional[Tuple[float, float]] = None,
+        points: int = VISUALIZATION_POINTS,
+        features: Iterable[str] = DEFAULT_FEATURES,
+        frames: bool = True,
+        wait: bool = False
+    ) -> AnalysisResult:
+        """Analyze raw audio bytes on the pool and return the requested features.
+
+        See `analyze_bytes` for `points`, `features` and `frames`, and
+        `submit` for `wait`.
+
+        Raises `AudioRejected` without using a worker when the header shows
+        the audio is over the decoder's duration or channel limits.
+        """
+        self.feature_extractor.decoder.check(content)
+        result = await self.submit(
+            analyze_bytes, content, f0_range, points, frozenset(features), frames, wait=wait
+        )
+        record_timings(result.timings)
+        if result.peak_rss_bytes is not None:
+            metrics.max_gauge("worker_peak_rss_bytes", result.peak_rss_bytes)
+        return result
+
+    async def submit(self, fn, *args, wait: bool = False):
+        """Run a picklable callable on the pool with backpressure and a timeout.
+
+        With a full queue, raises `AnalysisQueueFull`, or with `wait` waits
+        until a slot frees up. Waiting callers only get slots no one else
+        takes; bulk callers that also keep at most `max_workers` jobs in
+        flight leave the queue's capacity to interactive requests.
+        """
+        while self._in_flight >= self.max_workers + self.max_queue:
+            if not wait:
+                metrics.inc("analysis_jobs", outcome="rejected")
+                raise AnalysisQueueFull(
+                    f"Analysis queue is full ({self.max_queue} waiting jobs)"
+                )
+            await self._wait_for_slot()
+
+        if self.profile_sample_rate and random.random() < self.profile_sample_rate:
+            fn, args = run_profiled, (self.profile_dir, self.profile_min_seconds, fn, *args)
+
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM); replace the pool and retry once
+            logger.warning("Analysis pool broken, restarting")
+            self._executor = None
+            future = self._get_executor().submit(fn, *args)
+
+        # The slot is released when the job actually finishes, not when the
+        # caller stops waiting, so abandoned jobs still count against capacity
+        self._in_flight += 1
+        future.add_done_callback(lambda _: self._release_from_pool(loop))
+
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            metrics.inc("analysis_jobs", outcome="timeout")
+            raise AnalysisTimeout(f"Analysis did not finish within {self.timeout:.1f}s")
+        except Exception:
+            metrics.inc("analysis_jobs", outcome="error")
+            raise
+        metrics.inc("analysis_jobs", outcome="ok")
+        return result
+
+    def _release_from_pool(self, loop: asyncio.AbstractEventLoop):
+        # Called on the executor's management thread
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(self._release)
+
+    def _release(self):
+        self._in_flight -= 1
+        self._wake_waiter()
+
+    def _wake_waiter(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    async def _wait_for_slot(self):
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # Pass on a wake-up this caller will not use
+            if waiter.done() and not waiter.cancelled():
+                self._wake_waiter()
+            raise
+
+    def shutdown(self):
+        """Stop the worker processes, cancelling jobs that have not started."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
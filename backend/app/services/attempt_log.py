@@ -0,0 +1,195 @@
+import logging
+import queue
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Optional
+from ..models.progress import Attempt, PhonemeProgress
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Attempts written per transaction at most
+WRITE_BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp REAL NOT NULL,
+    user_id TEXT,
+    reference_id TEXT NOT NULL,
+    language TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    similarity_score REAL,
+    fundamental REAL,
+    centroid REAL NOT NULL,
+    rms REAL NOT NULL,
+    duration REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS attempts_user ON attempts (user_id, id);
+CREATE TABLE IF NOT EXISTS progress (
+    user_id TEXT NOT NULL,
+    language TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    total REAL NOT NULL,
+    rolling_mean REAL NOT NULL,
+    best REAL NOT NULL,
+    last REAL NOT NULL,
+    trend REAL NOT NULL,
+    first_at REAL NOT NULL,
+    last_at REAL NOT NULL,
+    PRIMARY KEY (user_id, language, symbol)
+);
+"""
+
+# SET expressions all see the row as it was before the update, so
+# rolling_mean in the trend term is the mean before this attempt
+_UPDATE_PROGRESS = """
+INSERT INTO progress (user_id, language, symbol, count, total, rolling_mean, best, last, trend, first_at, last_at)
+VALUES (:user_id, :language, :symbol, 1, :score, :score, :score, :score, 0.0, :timestamp, :timestamp)
+ON CONFLICT (user_id, language, symbol) DO UPDATE SET
+    count = count + 1,
+    total = total + :score,
+    rolling_mean = rolling_mean + :alpha * (:score - rolling_mean),
+    best = max(best, :score),
+    last = :score,
+    trend = trend + :alpha * ((:score - rolling_mean) - trend),
+    last_at = :timestamp
+"""
+
+_ATTEMPT_FIELDS = tuple(Attempt.__fields__)
+
+class AttemptLog:
+    """Append-only log of scored attempts with per-user, per-phoneme progress.
+
+    `record()` only enqueues; a background thread writes queued attempts in
+    batches, each batch and its aggregate updates in one SQLite transaction.
+    Aggregates are updated incrementally as attempts are written, so reading
+    a user's progress is a primary-key lookup, never a scan of the history.
+    When the queue is full, attempts are dropped and counted rather than
+    slowing down requests.
+    """
+
+    def __init__(self, db_path: Path, alpha: float = 0.2, max_queue: int = 10000):
+        self.db_path = db_path
+        self.alpha = alpha
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._queue: "queue.Queue[Optional[Attempt]]" = queue.Queue(max_queue)
+
+        # One connection per thread: the writer's, and one for reads
+        self._conn = self._connect()
+        self._conn.executescript(_SCHEMA)
+        self._read_conn = self._connect()
+        self._read_lock = threading.Lock()
+
+        self._writer = threading.Thread(target=self._run, name="attempt-log-writer", daemon=True)
+        self._writer.start()
+        metrics.set_gauge("attempt_log_queue", lambda: self._queue.qsize())
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def record(self, attempt: Attempt):
+        """Queue an attempt for writing; never blocks."""
+        try:
+            self._queue.put_nowait(attempt)
+        except queue.Full:
+            metrics.inc("attempts_dropped")
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            attempts = [attempt for attempt in batch if attempt is not None]
+            if attempts:
+                try:
+                    self._write(attempts)
+                    metrics.inc("attempts_recorded", len(attempts))
+                except Exception as e:
+                    logger.error(f"Failed to write {len(attempts)} attempts: {str(e)}")
+                    metrics.inc("attempts_dropped", len(attempts))
+            for _ in batch:
+                self._queue.task_done()
+            if None in batch:
+                return
+
+    def _write(self, attempts: List[Attempt]):
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.executemany(
+                f"INSERT INTO attempts ({', '.join(_ATTEMPT_FIELDS)}) "
+                f"VALUES ({', '.join(':' + field for field in _ATTEMPT_FIELDS)})",
+                [attempt.dict() for attempt in attempts]
+            )
+            # Attempts without a user or a score are logged but not aggregated
+            self._conn.executemany(_UPDATE_PROGRESS, [
+                {
+                    "user_id": attempt.user_id,
+                    "language": attempt.language,
+                    "symbol": attempt.symbol,
+                    "score": attempt.similarity_score,
+                    "timestamp": attempt.timestamp,
+                    "alpha": self.alpha
+                }
+                for attempt in attempts
+                if attempt.user_id is not None and attempt.similarity_score is not None
+            ])
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def progress(
+        self,
+        user_id: str,
+        language: Optional[str] = None,
+        symbol: Optional[str] = None
+    ) -> List[PhonemeProgress]:
+        """A user's aggregates, optionally for one language and/or symbol."""
+        query = "SELECT * FROM progress WHERE user_id = ?"
+        params: list = [user_id]
+        if language is not None:
+            query += " AND language = ?"
+            params.append(language)
+        if symbol is not None:
+            query += " AND symbol = ?"
+            params.append(symbol)
+        with self._read_lock:
+            cursor = self._read_conn.execute(query + " ORDER BY language, symbol", params)
+            columns = [column[0] for column in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        return [
+            PhonemeProgress(mean=row.pop("total") / row["count"], **row)
+            for row in rows
+        ]
+
+    def attempts(self, user_id: str, limit: int = 50) -> List[Attempt]:
+        """A user's most recent attempts, newest first."""
+        with self._read_lock:
+            rows = self._read_conn.execute(
+                f"SELECT {', '.join(_ATTEMPT_FIELDS)} FROM attempts WHERE user_id = ? ORDER BY id DESC LIMIT ?",
+                (user_id, limit)
+            ).fetchall()
+        return [Attempt(**dict(zip(_ATTEMPT_FIELDS, row))) for row in rows]
+
+    def flush(self):
+        """Wait until everything queued so far has been written."""
+        self._queue.join()
+
+    def close(self):
+        """Write what is queued, then stop the writer and close the database."""
+        self._queue.put(None)
+        self._writer.join()
+        self._conn.close()
+        with self._read_lock:
+            self._read_conn.close()
@@ -0,0 +1,226 @@
+import csv
+import json
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+from ..models.audio import AnalysisResult, BatchRecord
+from ..models.phoneme import PhonemeReference
+from .analysis_engine import analyze_bytes, init_worker
+from .feature_extractor import FeatureExtractor
+
+AUDIO_EXTENSIONS = {".wav", ".flac", ".ogg", ".mp3", ".aiff", ".aif"}
+
+class BatchItem(NamedTuple):
+    name: str
+    read: Callable[[], bytes]
+
+def iter_directory(directory: Path) -> Iterator[BatchItem]:
+    """Audio files below `directory`, in sorted order."""
+    for path in sorted(directory.rglob("*")):
+        if path.is_file() and path.suffix.lower() in AUDIO_EXTENSIONS:
+            yield BatchItem(str(path.relative_to(directory)), path.read_bytes)
+
+def iter_zip(archive: zipfile.ZipFile) -> Iterator[BatchItem]:
+    """Audio members of an open zip archive."""
+    for info in archive.infolist():
+        if not info.is_dir() and Path(info.filename).suffix.lower() in AUDIO_EXTENSIONS:
+            yield BatchItem(info.filename, lambda info=info: archive.read(info))
+
+def iter_manifest(manifest: Path) -> Iterator[BatchItem]:
+    """Files listed in a manifest, relative to the manifest's directory.
+
+    `.jsonl` manifests hold one object with a "path" key per line, `.csv`
+    manifests need a "path" column, anything else is one path per line.
+    """
+    base = manifest.parent
+    with manifest.open("r", encoding="utf-8") as f:
+        if manifest.suffix == ".jsonl":
+            paths = [json.loads(line)["path"] for line in f if line.strip()]
+        elif manifest.suffix == ".csv":
+            paths = [row["path"] for row in csv.DictReader(f)]
+        else:
+            paths = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    for path in paths:
+        yield BatchItem(path, (base / path).read_bytes)
+
+# Bulk reference imports look for the first of these in the archive
+MANIFEST_NAMES = ("manifest.jsonl", "manifest.json", "manifest.csv")
+
+def read_archive_manifest(archive: zipfile.ZipFile) -> Tuple[str, List[dict]]:
+    """Find and parse the manifest of a reference archive.
+
+    Returns the manifest's directory inside the archive, which its paths are
+    relative to, and its rows. `.jsonl` holds one object per line, `.json`
+    a list of objects and `.csv` a header row. Raises ValueError when there
+    is no manifest or it cannot be parsed.
+    """
+    members = [info for info in archive.infolist() if not info.is_dir()]
+    for name in MANIFEST_NAMES:
+        # The shallowest match wins, e.g. a single top-level folder in the archive
+        matches = sorted((m for m in members if Path(m.filename).name == name),
+                         key=lambda m: m.filename.count("/"))
+        if not matches:
+            continue
+        info = matches[0]
+        try:
+            text = archive.read(info).decode("utf-8-sig")
+            if name.endswith(".jsonl"):
+                rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+            elif name.endswith(".json"):
+                rows = json.loads(text)
+                if not isinstance(rows, list):
+                    raise ValueError("expected a list of objects")
+            else:
+                # Empty cells mean "not given", like a missing JSON key
+                rows = [{k: v for k, v in row.items() if v}
+                        for row in csv.DictReader(text.splitlines())]
+        except ValueError as e:
+            raise ValueError(f"Invalid manifest {info.filename}: {e}")
+        parent = str(Path(info.filename).parent)
+        return ("" if parent == "." else parent + "/"), rows
+    raise ValueError(f"Archive has no manifest ({', '.join(MANIFEST_NAMES)})")
+
+def open_source(source: Path) -> Tuple[List[BatchItem], Optional[zipfile.ZipFile]]:
+    """Batch items for a directory, zip archive or manifest.
+
+    Returns the items and, for archives, the open ZipFile the caller must close.
+    """
+    if source.is_dir():
+        return list(iter_directory(source)), None
+    if zipfile.is_zipfile(source):
+        archive = zipfile.ZipFile(source)
+        return list(iter_zip(archive)), archive
+    return list(iter_manifest(source)), None
+
+def build_record(
+    name: str,
+    analysis: Optional[AnalysisResult] = None,
+    match: Optional[Tuple[PhonemeReference, float]] = None,
+    error: Optional[str] = None
+) -> BatchRecord:
+    """Flatten an analysis and its best match into one output row."""
+    if analysis is None:
+        return BatchRecord(file=name, status="error", error=error or "Analysis failed")
+
+    features = analysis.features
+    record = BatchRecord(
+        file=name,
+        status="ok",
+        frequency_min=features.frequencyRange[0],
+        frequency_max=features.frequencyRange[1],
+        amplitude_min=features.amplitudeRange[0],
+        amplitude_max=features.amplitudeRange[1],
+        duration=analysis.values.duration,
+        centroid=features.centroid,
+        rms=features.rms,
+        fundamental=features.fundamental
+    )
+    if match is not None:
+        reference, score = match
+        record.reference_id = reference.id
+        record.symbol = reference.symbol
+        record.similarity_score = score
+    return record
+
+def run_batch(
+    items: Iterable[BatchItem],
+    max_workers: int,
+    feature_extractor: FeatureExtractor
+) -> Iterator[Tuple[BatchItem, Optional[AnalysisResult], Optional[str]]]:
+    """Analyze items on a process pool, yielding results as they complete.
+
+    At most two jobs per worker are in flight, so memory stays bounded no
+    matter how many files the batch holds.
+    """
+    items = iter(items)
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=init_worker,
+        initargs=(feature_extractor,)
+    ) as pool:
+        pending = {}
+
+        def fill() -> List[Tuple[BatchItem, str]]:
+            unreadable = []
+            while len(pending) < max_workers * 2:
+                item = next(items, None)
+                if item is None:
+                    break
+                try:
+                    content = item.read()
+                except OSError as e:
+                    # Unreadable input is reported, not fatal for the batch
+                    unreadable.append((item, f"Failed to read file: {e}"))
+                    continue
+                pending[pool.submit(analyze_bytes, content, frames=False)] = item
+            return unreadable
+
+        while True:
+            for item, error in fill():
+                yield item, None, error
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                try:
+                    yield item, future.result(), None
+                except Exception as e:
+                    yield item, None, str(e)
+
+class JsonlWriter:
+    """Writes one JSON object per line, flushing each record."""
+
+    def __init__(self, stream: TextIO, close_stream: bool = True):
+        self.stream = stream
+        self.close_stream = close_stream
+
+    def write(self, record: BatchRecord):
+        self.stream.write(record.json() + "\n")
+        self.stream.flush()
+
+    def close(self):
+        if self.close_stream:
+            self.stream.close()
+
+class ParquetWriter:
+    """Writes records as Parquet row groups. Requires the optional pyarrow package."""
+
+    def __init__(self, path: Path, row_group_size: int = 1000):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError("Parquet output requires pyarrow: pip install pyarrow")
+        self._pa = pyarrow
+        self._writer = None
+        self.path = path
+        self.row_group_size = row_group_size
+        self._rows: List[dict] = []
+
+    def write(self, record: BatchRecord):
+        self._rows.append(record.dict())
+        if len(self._rows) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self, force: bool = False):
+        if not self._rows and not force:
+            return
+        table = self._pa.Table.from_pylist(self._rows, schema=self._schema())
+        if self._writer is None:
+            self._writer = self._pa.parquet.ParquetWriter(str(self.path), table.schema)
+        self._writer.write_table(table)
+        self._rows = []
+
+    def _schema(self):
+        pa = self._pa
+        types = {str: pa.string(), float: pa.float64()}
+        return pa.schema([
+            (name, types[field.type_]) for name, field in BatchRecord.__fields__.items()
+        ])
+
+    def close(self):
+        # An empty batch still produces a file with the expected columns
+        self._flush(force=self._writer is None)
+        self._writer.close()
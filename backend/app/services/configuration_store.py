@@ -1,62 +1,257 @@
-import json
+import asyncio
+import threading
+import time
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+from ..models.frames import FrameFeatures
 from ..models.phoneme import PhonemeReference
+from .metrics import timed
+from .reference_backends import JsonReferenceBackend, ReferenceBackend
 
 class ConfigurationStore:
-    def __init__(self, storage_dir: Path):
+    """In-memory index of phoneme references, written through to a storage backend.
+
+    The index is authoritative for this process. Changes made to storage by
+    other processes are picked up by `refresh()`, which asks the backend only
+    for what changed since the last scan. Without a backend, references are
+    kept as JSON files in `storage_dir`; frame trajectories always live there.
+
+    Methods block on storage I/O; async code uses the `*_async` variants,
+    which run them on a worker thread.
+    """
+
+    def __init__(
+        self,
+        storage_dir: Path,
+        refresh_interval: float = 2.0,
+        backend: Optional[ReferenceBackend] = None
+    ):
         self.storage_dir = storage_dir
+        self.refresh_interval = refresh_interval
         # Create all necessary directories
         self.storage_dir.mkdir(parents=True, exist_ok=True)
         (self.storage_dir.parent / "reference_audio").mkdir(parents=True, exist_ok=True)
-        
+        self.backend = backend or JsonReferenceBackend(storage_dir)
+
+        self._lock = threading.RLock()
         self._references: Dict[str, PhonemeReference] = {}
+        self._by_language: Dict[str, Set[str]] = {}
+        self._by_symbol: Dict[str, Set[str]] = {}
+        self._index_keys: Dict[str, Tuple[str, str]] = {}
+        # Frame-level trajectories, loaded from their .npz files on first use
+        self._frames: Dict[str, FrameFeatures] = {}
+        self._last_scan = 0.0
+
+        # Incremented on every change so callers can cache derived data
+        self.version = 0
+        # Called with a reference id whenever that reference changes or is removed
+        self._listeners: List[Callable[[str], None]] = []
+
         self._load_references()
-        print(f"ConfigurationStore initialized at {storage_dir}")
+        print(f"ConfigurationStore initialized at {storage_dir} ({type(self.backend).__name__})")
 
     def _load_references(self):
-        """Load all reference configurations from storage directory."""
-        self._references.clear()  # Clear existing references
-        for file in self.storage_dir.glob("*.json"):
+        """Load all reference configurations from storage."""
+        with self._lock:
+            self._references.clear()  # Clear existing references
+            self._by_language.clear()
+            self._by_symbol.clear()
+            self._index_keys.clear()
+            self._frames.clear()
+            self.refresh(force=True)
+
+    def _index(self, reference: PhonemeReference):
+        # Replacing an existing entry keeps its position in listing order
+        self._drop_keys(reference.id)
+        self._references[reference.id] = reference
+        self._by_language.setdefault(reference.language, set()).add(reference.id)
+        self._by_symbol.setdefault(reference.symbol, set()).add(reference.id)
+        self._index_keys[reference.id] = (reference.language, reference.symbol)
+        self.version += 1
+        self._notify(reference.id)
+
+    def _unindex(self, reference_id: str):
+        self._drop_keys(reference_id)
+        if self._references.pop(reference_id, None) is not None:
+            self.version += 1
+            self._notify(reference_id)
+
+    def add_listener(self, listener: Callable[[str], None]):
+        """Call `listener(reference_id)` after a reference is saved, changed or removed.
+
+        Listeners run with the store locked and must not call back into it.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def _notify(self, reference_id: str):
+        for listener in self._listeners:
             try:
-                if file.stat().st_size > 0:
-                    with file.open('r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        reference = PhonemeReference.parse_obj(data)
-                        self._references[reference.id] = reference
+                listener(reference_id)
             except Exception as e:
-                print(f"Failed to load reference from {file}: {str(e)}")
+                print(f"Reference listener failed for {reference_id}: {str(e)}")
+
+    def _drop_keys(self, reference_id: str):
+        # A changed reference may come with re-extracted frames
+        self._frames.pop(reference_id, None)
+        keys = self._index_keys.pop(reference_id, None)
+        if keys is None:
+            return
+        language, symbol = keys
+        for index, key in ((self._by_language, language), (self._by_symbol, symbol)):
+            ids = index.get(key)
+            if ids is not None:
+                ids.discard(reference_id)
+                if not ids:
+                    del index[key]
+
+    def refresh(self, force: bool = False):
+        """Pick up references created, changed or deleted by other processes.
+
+        The backend is scanned only when its cheap change check fires or
+        `refresh_interval` seconds have passed; unchanged references are not
+        re-read. `force` reloads everything.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if (not force and now - self._last_scan < self.refresh_interval
+                    and not self.backend.changed()):
+                return
+            self._last_scan = now
+            with timed("store_refresh"):
+                updated, removed = self.backend.scan(full=force)
+                for reference_id in removed:
+                    self._unindex(reference_id)
+                for reference in updated:
+                    self._index(reference)
 
     def reload(self):
-        """Reload all references from disk."""
+        """Reload all references from storage."""
         self._load_references()
 
     def save_reference(self, reference: PhonemeReference):
         """Save a reference configuration to storage."""
+        self.save_references([reference])
+
+    def save_references(self, references: Sequence[PhonemeReference]):
+        """Save several references in one backend write.
+
+        The SQLite backend commits them as one transaction.
+        """
         try:
-            self._references[reference.id] = reference
-            file_path = self.storage_dir / f"{reference.id}.json"
-            
-            # Write to temporary file first
-            temp_path = file_path.with_suffix('.tmp')
-            with temp_path.open('w', encoding='utf-8') as f:
-                f.write(reference.json())
-            
-            # Rename temporary file to final name
-            temp_path.replace(file_path)
-            
-            # Reload references to ensure consistency
-            self.reload()
-            
+            with self._lock, timed("store_save"):
+                self.backend.save_many(references)
+                # Update the index directly; the backend skips our own
+                # writes on the next scan
+                for reference in references:
+                    self._index(reference)
+
         except Exception as e:
             raise Exception(f"Failed to save reference: {str(e)}")
 
+    def delete_reference(self, reference_id: str):
+        """Remove a reference and its frame trajectories."""
+        try:
+            with self._lock, timed("store_delete"):
+                self.backend.delete(reference_id)
+                self._frames_path(reference_id).unlink(missing_ok=True)
+                self._unindex(reference_id)
+        except Exception as e:
+            raise Exception(f"Failed to delete reference: {str(e)}")
+
+    def _frames_path(self, reference_id: str) -> Path:
+        return self.storage_dir / f"{reference_id}.frames.npz"
+
+    def save_frames(self, reference_id: str, frames: FrameFeatures):
+        """Store a reference's frame-level trajectories next to its JSON.
+
+        Save these before the reference itself, so other processes that see
+        the updated JSON also find the matching frames.
+        """
+        try:
+            with self._lock, timed("store_save_frames"):
+                frames.save(self._frames_path(reference_id))
+                self._frames[reference_id] = frames
+        except Exception as e:
+            raise Exception(f"Failed to save frames: {str(e)}")
+
+    def delete_frames(self, reference_id: str):
+        """Remove frame trajectories saved for a reference that was never stored."""
+        with self._lock:
+            self._frames.pop(reference_id, None)
+            self._frames_path(reference_id).unlink(missing_ok=True)
+
+    def get_frames(self, reference_id: str) -> Optional[FrameFeatures]:
+        """Frame-level trajectories of a reference, or None if not extracted."""
+        with self._lock:
+            frames = self._frames.get(reference_id)
+            if frames is not None:
+                return frames
+            try:
+                frames = FrameFeatures.load(self._frames_path(reference_id))
+            except FileNotFoundError:
+                return None
+            except Exception as e:
+                print(f"Failed to load frames for {reference_id}: {str(e)}")
+                return None
+            self._frames[reference_id] = frames
+            return frames
+
+    async def get_reference_async(self, reference_id: str) -> Optional[PhonemeReference]:
+        return await asyncio.to_thread(self.get_reference, reference_id)
+
+    async def list_references_async(
+        self,
+        language: Optional[str] = None,
+        symbol: Optional[str] = None
+    ) -> List[PhonemeReference]:
+        return await asyncio.to_thread(self.list_references, language, symbol)
+
+    async def save_reference_async(self, reference: PhonemeReference):
+        await asyncio.to_thread(self.save_reference, reference)
+
+    async def save_references_async(self, references: Sequence[PhonemeReference]):
+        await asyncio.to_thread(self.save_references, references)
+
+    async def save_frames_async(self, reference_id: str, frames: FrameFeatures):
+        await asyncio.to_thread(self.save_frames, reference_id, frames)
+
+    async def get_frames_async(self, reference_id: str) -> Optional[FrameFeatures]:
+        return await asyncio.to_thread(self.get_frames, reference_id)
+
+    def close(self):
+        with self._lock:
+            self.backend.close()
+
+    def __len__(self) -> int:
+        return len(self._references)
+
     def get_reference(self, reference_id: str) -> Optional[PhonemeReference]:
         """Get a reference configuration by ID."""
+        self.refresh()
         return self._references.get(reference_id)
 
-    def list_references(self) -> list[PhonemeReference]:
-        """List all reference configurations."""
-        # Reload to ensure we have latest data
-        self.reload()
-        return list(self._references.values())
\ No newline at end of file
+    def versioned_references(self) -> Tuple[int, List[PhonemeReference]]:
+        """All references together with the version they belong to, read atomically."""
+        self.refresh()
+        with self._lock:
+            return self.version, list(self._references.values())
+
+    def list_references(
+        self,
+        language: Optional[str] = None,
+        symbol: Optional[str] = None
+    ) -> list[PhonemeReference]:
+        """List reference configurations, optionally filtered by language and symbol."""
+        self.refresh()
+        with self._lock:
+            if language is None and symbol is None:
+                return list(self._references.values())
+
+            ids: Optional[Set[str]] = None
+            if language is not None:
+                ids = self._by_language.get(language, set())
+            if symbol is not None:
+                symbol_ids = self._by_symbol.get(symbol, set())
+                ids = symbol_ids if ids is None else ids & symbol_ids
+            return [self._references[reference_id] for reference_id in ids]
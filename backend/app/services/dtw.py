@@ -0,0 +1,39 @@
+import numpy as np
+
+def banded_dtw(cost: np.ndarray, radius: int) -> float:
+    """Dynamic time warping distance restricted to a Sakoe-Chiba band.
+
+    `cost` is the (n, m) frame-to-frame distance matrix. Cells further than
+    `radius` columns from the (stretched) diagonal are never visited. Each
+    row is computed with whole-array operations: the vertical and diagonal
+    predecessors come from the previous row, and the horizontal chain
+    D[i, j] = cost[i, j] + min(best[j], D[i, j - 1]) is a running minimum
+    over prefix sums. Returns the path cost divided by n + m, so clips of
+    different lengths are comparable.
+    """
+    n, m = cost.shape
+    if n == 0 or m == 0:
+        return float("inf")
+
+    # Follow the diagonal from corner to corner, and keep the band at least
+    # as wide as its slope so consecutive rows always overlap
+    slope = (m - 1) / max(n - 1, 1)
+    radius = max(radius, int(np.ceil(slope)))
+    centers = np.arange(n) * slope
+    lows = np.clip(np.floor(centers - radius), 0, m - 1).astype(int)
+    highs = np.clip(np.ceil(centers + radius) + 1, 1, m).astype(int)
+
+    previous = np.full(m + 1, np.inf)  # previous[j + 1] is D[i - 1, j]
+    previous[1:highs[0] + 1] = np.cumsum(cost[0, :highs[0]])
+
+    for i in range(1, n):
+        lo, hi = lows[i], highs[i]
+        # min(D[i - 1, j], D[i - 1, j - 1])
+        best = np.minimum(previous[lo + 1:hi + 1], previous[lo:hi])
+        local = cost[i, lo:hi]
+        sums = np.cumsum(local)
+        current = np.full(m + 1, np.inf)
+        current[lo + 1:hi + 1] = sums + np.minimum.accumulate(best - (sums - local))
+        previous = current
+
+    return float(previous[m] / (n + m))
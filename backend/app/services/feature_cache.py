@@ -0,0 +1,95 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import numpy as np
+from pathlib import Path
+from typing import Optional
+from ..models.audio import AnalysisResult
+from ..models.frames import FrameFeatures
+from ..models.phoneme import PhonemeFeatures
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class FeatureCache:
+    """Content-addressed on-disk cache of analysis results.
+
+    Entries are keyed by the SHA-256 of the audio bytes combined with the
+    extractor parameters, so identical audio shared by several references is
+    analyzed once, and a change of extractor version or settings misses the
+    cache instead of returning stale values. Each entry is a small `.npz`
+    file that is only read when requested.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(content: bytes, params: dict) -> str:
+        """Cache key for `content` analyzed with extractor `params`."""
+        digest = hashlib.sha256(content)
+        digest.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        # Two-level fan-out keeps directories small with many entries
+        return self.cache_dir / key[:2] / f"{key}.npz"
+
+    def get(self, key: str) -> Optional[AnalysisResult]:
+        """Load a cached result, or None when the key is not cached."""
+        path = self._path(key)
+        if not path.exists():
+            metrics.inc("feature_cache_requests", result="miss")
+            return None
+        try:
+            with np.load(path) as data:
+                scalars = data["features"]
+                result = AnalysisResult(
+                    features=PhonemeFeatures(
+                        frequencyRange=(float(scalars[0]), float(scalars[1])),
+                        amplitudeRange=(float(scalars[2]), float(scalars[3])),
+                        durationRange=(float(scalars[4]), float(scalars[5])),
+                        centroid=float(scalars[6]),
+                        rms=float(scalars[7]),
+                        fundamental=None if np.isnan(scalars[8]) else float(scalars[8]),
+                        formants=None if np.isnan(scalars[9:12]).any() else tuple(float(f) for f in scalars[9:12])
+                    ),
+                    envelope=data["envelope"].tolist(),
+                    spectrum=data["spectrum"].tolist(),
+                    frames=FrameFeatures.from_arrays(data) if "mfcc" in data else None
+                )
+        except Exception as e:
+            logger.warning(f"Discarding unreadable feature cache entry {path}: {e}")
+            metrics.inc("feature_cache_requests", result="miss")
+            return None
+        metrics.inc("feature_cache_requests", result="hit")
+        return result
+
+    def put(self, key: str, result: AnalysisResult):
+        """Store a result; concurrent writers of the same key, from any thread or process, are harmless."""
+        features = result.features
+        scalars = np.array([
+            *features.frequencyRange,
+            *features.amplitudeRange,
+            *features.durationRange,
+            features.centroid,
+            features.rms,
+            np.nan if features.fundamental is None else features.fundamental,
+            *(features.formants or (np.nan,) * 3)
+        ], dtype=np.float64)
+
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with temp_path.open("wb") as f:
+            np.savez_compressed(
+                f,
+                features=scalars,
+                envelope=np.asarray(result.envelope, dtype=np.float32),
+                spectrum=np.asarray(result.spectrum, dtype=np.float32),
+                **(result.frames.arrays() if result.frames is not None else {})
+            )
+        temp_path.replace(path)
@@ -1,63 +1,243 @@
 import numpy as np
-import librosa
 from pathlib import Path
-from ..models.phoneme import PhonemeFeatures
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+from .analysis_context import AnalysisContext
+from .audio_decoder import AudioDecoder
+from .dtw import banded_dtw
+from .metrics import timed
+from .formants import median_formants
+from .pitch import PITCH_METHODS, estimate_f0, median_f0, voiced_f0
+from ..models.phoneme import FEATURE_NAMES, PhonemeFeatures
 from ..models.audio import AudioFeatures
+from ..models.frames import FrameFeatures
+
+# "summary" compares whole-clip scalars; "dtw" aligns frame-level
+# trajectories, so the temporal shape of the sound counts too
+COMPARISON_MODES = ("summary", "dtw")
+
+# Summary scoring needs the frequency range (from the spectrum), rms and
+# centroid; everything else is computed only when asked for
+SUMMARY_FEATURES: FrozenSet[str] = frozenset({"rms", "centroid", "spectrum"})
+DEFAULT_FEATURES: FrozenSet[str] = SUMMARY_FEATURES | {"f0", "formants"}
+
+def scoring_features(declared: Optional[Iterable[str]] = None) -> FrozenSet[str]:
+    """Features to compute for scoring: the summary ones plus those a
+    reference declares, or the defaults when it declares none."""
+    return SUMMARY_FEATURES | (frozenset(declared) if declared is not None else DEFAULT_FEATURES)
+
+N_MFCC = 13
+# Summary score weights of frequency range, rms and centroid; when both
+# clips have formants, they take over most of the weight of the range and
+# centroid, which only coarsely describe vowel quality
+SUMMARY_WEIGHTS = (0.4, 0.3, 0.3)
+FORMANT_SUMMARY_WEIGHTS = (0.2, 0.2, 0.2, 0.4)
+# Weights of F1, F2 and F3 within the formant score; F1 and F2 identify vowels
+FORMANT_WEIGHTS = (0.4, 0.4, 0.2)
+# DTW band half-width as a fraction of the longer clip, and the mean aligned
+# frame distance at which the trajectory score falls to 1/e (about 37)
+DTW_BAND_RATIO = 0.2
+DTW_DISTANCE_SCALE = 1.0
+# Per-frame vector weights: timbre (MFCC 1-12, c0 is loudness and covered
+# by the envelope), loudness envelope relative to the peak, centroid in kHz
+MFCC_WEIGHT = 1 / 40
+ENVELOPE_WEIGHT = 1.0
+CENTROID_WEIGHT = 0.25
+# F1 and F2 in kHz, when both clips have formant trajectories
+FORMANT_WEIGHT = 0.5
 
 class FeatureExtractor:
-    def __init__(self):
+    # Bump whenever extraction logic changes so cached features are recomputed
+    version = 5
+    # Bump whenever similarity scoring changes so cached scores are recomputed
+    scoring_version = 2
+
+    def __init__(
+        self,
+        pitch_method: str = "autocorr",
+        resample_type: str = "soxr_hq",
+        max_duration: float | None = None,
+        max_channels: int | None = None,
+        stream_after: float | None = 30.0,
+        trim_threshold_db: float | None = 40.0,
+        trim_padding: float = 0.1
+    ):
+        if pitch_method not in PITCH_METHODS:
+            raise ValueError(f"Unknown pitch method '{pitch_method}', expected one of {PITCH_METHODS}")
         self.sample_rate = 22050  # Standard for speech analysis
+        self.n_fft = 2048
+        self.hop_length = 512
+        self.pitch_method = pitch_method
+        self.decoder = AudioDecoder(self.sample_rate, resample_type, max_duration, max_channels)
+        # Recordings longer than this many seconds are analyzed block by block
+        self.stream_after = stream_after
+        # Silence around the phoneme is cut before analysis; None disables it
+        self.trim_threshold_db = trim_threshold_db
+        self.trim_padding = trim_padding
+
+    def cache_params(self) -> dict:
+        """Parameters that determine the extracted values, used in cache keys."""
+        return {
+            "version": self.version,
+            "sample_rate": self.sample_rate,
+            "n_fft": self.n_fft,
+            "hop_length": self.hop_length,
+            "pitch_method": self.pitch_method,
+            "resample_type": self.decoder.resample_type,
+            "trim_threshold_db": self.trim_threshold_db,
+            "trim_padding": self.trim_padding
+        }
+
+    def scoring_params(self, mode: str, features: Iterable[str] = DEFAULT_FEATURES) -> dict:
+        """Parameters that determine a similarity score, used in result cache keys."""
+        return {
+            **self.cache_params(),
+            "scoring_version": self.scoring_version,
+            "mode": mode,
+            "features": sorted(features)
+        }
 
     async def extract_features(self, audio_path: Path) -> PhonemeFeatures:
         """Extract acoustic features from audio file."""
         try:
-            # Load audio file
-            y, sr = librosa.load(str(audio_path), sr=self.sample_rate)
-            
-            # Calculate features
-            frequencies = np.abs(librosa.stft(y))
-            centroid = float(librosa.feature.spectral_centroid(y=y, sr=sr).mean())
-            rms = float(librosa.feature.rms(y=y).mean())
-            
-            # Get frequency range
-            freq_range = self._calculate_frequency_range(frequencies)
-            
-            # Get amplitude range
-            amp_range = self._calculate_amplitude_range(y)
-            
-            # Get duration range
-            duration = float(len(y) / sr)
-            dur_range = (max(0.1, duration * 0.8), duration * 1.2)
-            
-            return PhonemeFeatures(
-                frequencyRange=freq_range,
-                amplitudeRange=amp_range,
-                durationRange=dur_range,
-                centroid=centroid,
-                rms=rms
+            context = AnalysisContext.from_path(
+                audio_path, self.decoder, self.n_fft, self.hop_length
             )
-            
         except Exception as e:
             raise Exception(f"Feature extraction failed: {str(e)}")
+        return self.extract_features_from_context(self.trim(context))
+
+    def trim(self, context: AnalysisContext) -> AnalysisContext:
+        """Cut the context to its voiced region, if trimming is enabled.
+
+        Only the cheap RMS pass runs over the full clip; the STFT and
+        everything derived from it only see the voiced samples.
+        """
+        if self.trim_threshold_db is None:
+            return context
+        return context.trimmed(self.trim_threshold_db, self.trim_padding)
+
+    def extract(
+        self,
+        context: AnalysisContext,
+        features: Iterable[str] = DEFAULT_FEATURES,
+        f0_range: Optional[Tuple[float, float]] = None
+    ) -> Dict[str, Any]:
+        """Whole-clip values of only the requested features, from the context's shared frames."""
+        features = frozenset(features)
+        unknown = features - set(FEATURE_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown features {sorted(unknown)}, expected some of {FEATURE_NAMES}")
+
+        values: Dict[str, Any] = {}
+        with timed("extract_features"):
+            if "rms" in features:
+                values["rms"] = float(context.rms.mean())
+            if "centroid" in features:
+                values["centroid"] = context.spectral_centroid()
+            if "spectrum" in features:
+                values["spectrum"] = context.magnitude.mean(axis=1)
+            if "f0" in features:
+                values["fundamental"] = median_f0(estimate_f0(context, self.pitch_method, f0_range))
+            if "mfcc" in features:
+                values["mfcc"] = context.mfcc(N_MFCC).mean(axis=1)
+            if "formants" in features:
+                values["formants"] = median_formants(self.voiced_formants(context))
+        return values
+
+    def extract_features_from_context(
+        self,
+        context: AnalysisContext,
+        f0_range: Optional[Tuple[float, float]] = None,
+        features: Iterable[str] = DEFAULT_FEATURES
+    ) -> PhonemeFeatures:
+        """Extract acoustic features from already decoded audio.
+
+        The summary features are always computed; of the rest, only those
+        in `features`. `f0_range` narrows the pitch search.
+        """
+        try:
+            values = self.extract(context, SUMMARY_FEATURES | frozenset(features), f0_range)
+            return self.summarize_values(values, context)
+        except Exception as e:
+            raise Exception(f"Feature extraction failed: {str(e)}")
+
+    def summarize_values(self, values: Dict[str, Any], context: AnalysisContext) -> PhonemeFeatures:
+        """Summary features from `extract()` output that includes SUMMARY_FEATURES."""
+        return self.summarize(
+            freq_profile=values["spectrum"],
+            mean_rms=values["rms"],
+            centroid=values["centroid"],
+            duration=context.duration,
+            sample_rate=context.sr,
+            fundamental=values.get("fundamental"),
+            formants=values.get("formants")
+        )
 
-    def _calculate_frequency_range(self, frequencies: np.ndarray) -> tuple[float, float]:
-        """Calculate the significant frequency range."""
-        freq_profile = frequencies.mean(axis=1)
+    @staticmethod
+    def voiced_formants(context: AnalysisContext) -> np.ndarray:
+        """The context's formant tracks, kept only in frames loud enough to be voiced."""
+        return np.vstack([voiced_f0(track, context.rms) for track in context.formants])
+
+    def extract_frames(self, context: AnalysisContext, formants: bool = True) -> FrameFeatures:
+        """Frame-level RMS, centroid, MFCC and optionally formant trajectories for DTW comparison."""
+        with timed("extract_frames"):
+            return FrameFeatures(
+                rms=context.rms,
+                centroid=context.centroid,
+                mfcc=context.mfcc(N_MFCC),
+                hop_seconds=context.hop_length / context.sr,
+                formants=self.voiced_formants(context) if formants else None
+            )
+
+    def summarize(
+        self,
+        freq_profile: np.ndarray,
+        mean_rms: float,
+        centroid: float,
+        duration: float,
+        sample_rate: int | None = None,
+        fundamental: float | None = None,
+        formants: Tuple[float, float, float] | None = None
+    ) -> PhonemeFeatures:
+        """Build features from whole-clip statistics.
+
+        Shared by the full-clip path and incremental analyzers, which only
+        keep running means rather than frame matrices.
+        """
+        # Get frequency range
+        freq_range = self._calculate_frequency_range(freq_profile, sample_rate or self.sample_rate)
+        
+        # Get amplitude range
+        amp_range = self._calculate_amplitude_range(mean_rms)
+        
+        # Get duration range
+        dur_range = (max(0.1, duration * 0.8), duration * 1.2)
+        
+        return PhonemeFeatures(
+            frequencyRange=freq_range,
+            amplitudeRange=amp_range,
+            durationRange=dur_range,
+            centroid=centroid,
+            rms=mean_rms,
+            fundamental=fundamental,
+            formants=formants
+        )
+
+    def _calculate_frequency_range(self, freq_profile: np.ndarray, sample_rate: int) -> tuple[float, float]:
+        """Calculate the significant frequency range from the average magnitude spectrum."""
         threshold = freq_profile.max() * 0.1
         
         significant_freqs = np.where(freq_profile > threshold)[0]
         if len(significant_freqs) == 0:
             return (0.0, 1000.0)  # Default range
             
-        min_freq = float(significant_freqs[0] * self.sample_rate / frequencies.shape[0])
-        max_freq = float(significant_freqs[-1] * self.sample_rate / frequencies.shape[0])
+        min_freq = float(significant_freqs[0] * sample_rate / freq_profile.shape[0])
+        max_freq = float(significant_freqs[-1] * sample_rate / freq_profile.shape[0])
         
         return (min_freq, max_freq)
 
-    def _calculate_amplitude_range(self, y: np.ndarray) -> tuple[float, float]:
+    def _calculate_amplitude_range(self, mean_rms: float) -> tuple[float, float]:
         """Calculate the acceptable amplitude range."""
-        rms = librosa.feature.rms(y=y)[0]
-        mean_rms = float(rms.mean())
         return (mean_rms * 0.5, mean_rms * 1.5)
 
     def calculate_ranges(self, features: PhonemeFeatures, tolerance: float) -> PhonemeFeatures:
@@ -81,7 +261,9 @@ class FeatureExtractor:
             amplitudeRange=amp_range,
             durationRange=features.durationRange,
             centroid=features.centroid,
-            rms=features.rms
+            rms=features.rms,
+            fundamental=features.fundamental,
+            formants=features.formants
         )
 
     def calculate_similarity(self, features1: AudioFeatures, features2: AudioFeatures | None) -> float:
@@ -105,14 +287,106 @@ class FeatureExtractor:
             centroid_score = max(0, 1 - centroid_diff)
 
             # Weighted average
+            if features1.formants and features2.formants:
+                formants1 = np.asarray(features1.formants)
+                formants2 = np.asarray(features2.formants)
+                formant_diff = np.abs(formants1 - formants2) / np.maximum(formants1, formants2)
+                formant_score = float(np.clip(1 - formant_diff, 0, None) @ FORMANT_WEIGHTS)
+                weights = FORMANT_SUMMARY_WEIGHTS
+            else:
+                formant_score = 0.0
+                weights = (*SUMMARY_WEIGHTS, 0.0)
             similarity = (
-                freq_score * 0.4 +
-                amp_score * 0.3 +
-                centroid_score * 0.3
+                freq_score * weights[0] +
+                amp_score * weights[1] +
+                centroid_score * weights[2] +
+                formant_score * weights[3]
             ) * 100  # Convert to percentage
 
             return min(100, max(0, similarity))  # Ensure score is between 0 and 100
             
         except Exception as e:
             print(f"Error calculating similarity: {str(e)}")
-            return 0.0
\ No newline at end of file
+            return 0.0
+
+    @staticmethod
+    def feature_vector(features: AudioFeatures) -> np.ndarray:
+        """Scored quantities as a vector: frequency-range midpoint, rms,
+        centroid and F1-F3, which are NaN when not extracted."""
+        return np.array([
+            sum(features.frequencyRange) / 2,
+            features.rms,
+            features.centroid,
+            *(features.formants or (np.nan,) * 3)
+        ], dtype=np.float64)
+
+    def calculate_similarity_matrix(self, features: AudioFeatures, reference_matrix: np.ndarray) -> np.ndarray:
+        """Score one set of features against many references in a single pass.
+
+        `reference_matrix` has one `feature_vector` per row. Returns one score
+        per row, identical to calling `calculate_similarity` for each reference.
+        """
+        vector = self.feature_vector(features)
+        with timed("similarity_matrix"), np.errstate(divide="ignore", invalid="ignore"):
+            diff = np.abs(reference_matrix - vector) / np.maximum(reference_matrix, vector)
+            closeness = np.clip(1 - diff, 0, None)
+            scores = closeness[:, :3] @ np.array(SUMMARY_WEIGHTS) * 100
+            # Rows where both sides have formants; NaN anywhere else
+            with_formants = np.isfinite(diff[:, 3:]).all(axis=1)
+            if with_formants.any():
+                scores[with_formants] = (
+                    closeness[with_formants, :3] @ np.array(FORMANT_SUMMARY_WEIGHTS[:3])
+                    + closeness[with_formants, 3:] @ np.array(FORMANT_WEIGHTS) * FORMANT_SUMMARY_WEIGHTS[3]
+                ) * 100
+
+        # A zero denominator makes the scalar version fall back to 0
+        scores[~np.isfinite(diff[:, :3]).all(axis=1)] = 0.0
+        return np.clip(scores, 0, 100)
+
+    @staticmethod
+    def frame_matrix(frames: FrameFeatures, formants: bool = False) -> np.ndarray:
+        """One weighted vector per frame, shape (frames, dims).
+
+        With `formants`, F1 and F2 are appended; frames where they were not
+        found take values interpolated from their neighbours.
+        """
+        peak = frames.rms.max() if len(frames) else 0.0
+        envelope = frames.rms / peak if peak > 0 else frames.rms
+        columns = [
+            # Timbre counts in proportion to loudness: in near-silent frames
+            # the MFCCs mostly describe background noise
+            frames.mfcc[1:].T * (envelope[:, None] * MFCC_WEIGHT),
+            envelope[:, None] * ENVELOPE_WEIGHT,
+            frames.centroid[:, None] / 1000 * CENTROID_WEIGHT
+        ]
+        if formants:
+            tracks = np.vstack([_fill_gaps(track) for track in frames.formants[:2]])
+            # Like timbre, formants of quiet frames count less
+            columns.append(tracks.T / 1000 * (envelope[:, None] * FORMANT_WEIGHT))
+        return np.hstack(columns)
+
+    def calculate_trajectory_similarity(self, attempt: FrameFeatures, reference: FrameFeatures) -> float:
+        """Score 0-100 from the DTW alignment of two clips' frame trajectories.
+
+        The alignment is banded, so a 1-second clip (about 43 frames) is
+        compared in well under a millisecond.
+        """
+        if not len(attempt) or not len(reference):
+            return 0.0
+        with timed("similarity_dtw"):
+            formants = attempt.formants is not None and reference.formants is not None
+            a = self.frame_matrix(attempt, formants)
+            b = self.frame_matrix(reference, formants)
+            # Pairwise Euclidean distances without a Python loop
+            squared = (a ** 2).sum(axis=1)[:, None] + (b ** 2).sum(axis=1)[None, :] - 2 * a @ b.T
+            cost = np.sqrt(np.maximum(squared, 0.0))
+            radius = int(np.ceil(DTW_BAND_RATIO * max(len(a), len(b))))
+            distance = banded_dtw(cost, radius)
+        return float(100 * np.exp(-distance / DTW_DISTANCE_SCALE))
+
+def _fill_gaps(track: np.ndarray) -> np.ndarray:
+    """Replace NaN frames by linear interpolation between found ones, 0 if none are."""
+    found = np.flatnonzero(np.isfinite(track))
+    if not len(found):
+        return np.zeros(len(track))
+    return np.interp(np.arange(len(track)), found, track[found])
@@ -0,0 +1,104 @@
+import numpy as np
+from functools import lru_cache
+from typing import Optional, Tuple
+
+# Formants are tracked below this frequency; F3 of most voices is under 3.5 kHz
+FORMANT_MAX_HZ = 5500.0
+# Two poles per formant expected below FORMANT_MAX_HZ, plus two for the
+# glottal and radiation spectral tilt
+LPC_ORDER = 12
+PRE_EMPHASIS = 0.97
+# Poles outside these limits are spectral shaping, not formants
+MIN_FORMANT_HZ = 90.0
+MAX_BANDWIDTH_HZ = 400.0
+N_FORMANTS = 3
+
+@lru_cache(maxsize=8)
+def _band(sr: int, n_fft: int) -> Tuple[int, float, np.ndarray]:
+    """Bins up to FORMANT_MAX_HZ, their effective sample rate, and the basis
+    that turns their power into the first LPC_ORDER + 1 autocorrelation lags.
+
+    Keeping bins 0..n_bins of the spectrum is an ideal low-pass plus
+    decimation, so the band's autocorrelation is that of a signal at
+    `band_sr`. The basis is the inverse real FFT restricted to the lags LPC
+    uses, with the pre-emphasis filter's gain folded in.
+    """
+    n_bins = min(int(round(FORMANT_MAX_HZ * n_fft / sr)), n_fft // 2)
+    band_sr = 2 * n_bins * sr / n_fft
+    bins = np.arange(n_bins + 1)
+    emphasis = 1 + PRE_EMPHASIS ** 2 - 2 * PRE_EMPHASIS * np.cos(2 * np.pi * bins / n_fft)
+    # Interior bins stand for a conjugate pair
+    weights = np.where((bins == 0) | (bins == n_bins), 1.0, 2.0) / (2 * n_bins)
+    lags = np.arange(LPC_ORDER + 1)[:, None]
+    basis = np.cos(np.pi * lags * bins / n_bins) * (weights * emphasis)
+    return n_bins, band_sr, basis
+
+def levinson(r: np.ndarray, order: int) -> np.ndarray:
+    """LPC coefficients for every row of autocorrelations at once.
+
+    `r` has shape (frames, >= order + 1); returns (frames, order + 1) with
+    a leading 1. The recursion is over the order, so each step is one
+    vectorized update across all frames.
+    """
+    n_frames = r.shape[0]
+    a = np.zeros((n_frames, order + 1))
+    a[:, 0] = 1.0
+    error = r[:, 0].copy()
+    for i in range(1, order + 1):
+        acc = r[:, i] + (a[:, 1:i] * r[:, i - 1:0:-1]).sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            k = np.where(error > 0, -acc / error, 0.0)
+        a[:, 1:i] = a[:, 1:i] + k[:, None] * a[:, i - 1:0:-1]
+        a[:, i] = k
+        error = error * (1 - k ** 2)
+    return a
+
+def lpc_formants(magnitude: np.ndarray, sr: int, n_fft: int) -> np.ndarray:
+    """F1-F3 of every frame from STFT magnitudes, shape (N_FORMANTS, frames).
+
+    The autocorrelation for LPC is the inverse FFT of the pre-emphasized
+    power spectrum below FORMANT_MAX_HZ, so no further pass over the signal
+    is needed, as in `autocorr_f0`; only the lags LPC uses are computed.
+    All frames' polynomials are solved in one batched eigenvalue call on
+    their companion matrices. Frames where fewer formants are found,
+    including silent ones, hold NaN; they are not gated by loudness here.
+    """
+    n_bins, band_sr, basis = _band(sr, n_fft)
+    n_frames = magnitude.shape[1]
+    formants = np.full((N_FORMANTS, n_frames), np.nan)
+    if n_frames == 0:
+        return formants
+
+    r = (basis @ magnitude[:n_bins + 1] ** 2).T
+    active = r[:, 0] > 0
+    if not active.any():
+        return formants
+    # A little white noise keeps the recursion stable on near-pure tones
+    r = r[active]
+    r[:, 0] *= 1 + 1e-9
+    a = levinson(r, LPC_ORDER)
+
+    companion = np.zeros((len(a), LPC_ORDER, LPC_ORDER))
+    companion[:, 0, :] = -a[:, 1:]
+    companion[:, np.arange(1, LPC_ORDER), np.arange(LPC_ORDER - 1)] = 1.0
+    roots = np.linalg.eigvals(companion)
+
+    freqs = np.angle(roots) * band_sr / (2 * np.pi)
+    with np.errstate(divide="ignore"):
+        bandwidths = -np.log(np.abs(roots)) * band_sr / np.pi
+    candidate = (
+        (roots.imag > 0)
+        & (freqs > MIN_FORMANT_HZ)
+        & (freqs < band_sr / 2 - MIN_FORMANT_HZ)
+        & (bandwidths < MAX_BANDWIDTH_HZ)
+    )
+    lowest = np.sort(np.where(candidate, freqs, np.inf), axis=1)[:, :N_FORMANTS]
+    formants[:, active] = np.where(np.isfinite(lowest), lowest, np.nan).T
+    return formants
+
+def median_formants(formants: np.ndarray) -> Optional[Tuple[float, ...]]:
+    """Median of each formant over the frames where all are found, or None."""
+    found = formants[:, np.isfinite(formants).all(axis=0)]
+    if not found.shape[1]:
+        return None
+    return tuple(float(value) for value in np.median(found, axis=1))
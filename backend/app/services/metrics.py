@@ -0,0 +1,188 @@
+import cProfile
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Latency buckets in seconds, from sub-millisecond similarity to slow pyin runs
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+class MetricsRegistry:
+    """Process-local counters, gauges and histograms in Prometheus text format.
+
+    Kept deliberately small: label sets are passed as keyword arguments and
+    gauges can be callables evaluated at scrape time.
+    """
+
+    def __init__(self, namespace: str = "speech"):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._gauges: Dict[str, Dict[Labels, Callable[[], float] | float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+
+    def describe(self, name: str, kind: str, help_text: str):
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name: str, amount: float = 1.0, **labels: str):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def set_gauge(self, name: str, value: Callable[[], float] | float, **labels: str):
+        """Set a gauge to a value, or to a callable read on every scrape."""
+        with self._lock:
+            self._gauges.setdefault(name, {})[tuple(sorted(labels.items()))] = value
+
+    def max_gauge(self, name: str, value: float, **labels: str):
+        """Raise a high-water-mark gauge if `value` exceeds it."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._gauges.setdefault(name, {})
+            current = series.get(key, 0.0)
+            if callable(current) or value > current:
+                series[key] = value
+
+    def observe(self, name: str, value: float, **labels: str):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def render(self) -> str:
+        """Prometheus text exposition format, version 0.0.4."""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in self._counters.items():
+                self._header(lines, name, "counter")
+                for labels, value in series.items():
+                    lines.append(f"{self._name(name)}{_format_labels(labels)} {_format_value(value)}")
+
+            for name, series in self._gauges.items():
+                self._header(lines, name, "gauge")
+                for labels, value in series.items():
+                    value = value() if callable(value) else value
+                    lines.append(f"{self._name(name)}{_format_labels(labels)} {_format_value(value)}")
+
+            for name, series in self._histograms.items():
+                self._header(lines, name, "histogram")
+                full_name = self._name(name)
+                for labels, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        bucket_labels = labels + (("le", _format_value(bound)),)
+                        lines.append(f"{full_name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                    lines.append(f"{full_name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{full_name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+                    lines.append(f"{full_name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def _name(self, name: str) -> str:
+        return f"{self.namespace}_{name}"
+
+    def _header(self, lines: List[str], name: str, default_kind: str):
+        kind, help_text = self._help.get(name, (default_kind, ""))
+        if help_text:
+            lines.append(f"# HELP {self._name(name)} {help_text}")
+        lines.append(f"# TYPE {self._name(name)} {kind}")
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+metrics = MetricsRegistry()
+metrics.describe("stage_seconds", "histogram", "Time spent in each analysis or storage stage")
+
+# Set inside worker processes so stage timings travel back with the result
+_collector: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_collector", default=None)
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Time a block as `stage`, into the active collector or the registry."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        collector = _collector.get()
+        if collector is not None:
+            collector[stage] = collector.get(stage, 0.0) + elapsed
+        else:
+            metrics.observe("stage_seconds", elapsed, stage=stage)
+
+@contextmanager
+def collect_timings() -> Iterator[Dict[str, float]]:
+    """Gather `timed` stages into a dict instead of the registry."""
+    timings: Dict[str, float] = {}
+    token = _collector.set(timings)
+    try:
+        yield timings
+    finally:
+        _collector.reset(token)
+
+def record_timings(timings: Dict[str, float]):
+    """Add stage timings collected elsewhere, e.g. in a worker process."""
+    for stage, elapsed in timings.items():
+        metrics.observe("stage_seconds", elapsed, stage=stage)
+
+def peak_rss_bytes() -> Optional[int]:
+    """High-water mark of this process's resident memory."""
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def run_profiled(profile_dir: str, min_seconds: float, fn, *args):
+    """Run `fn` under cProfile and keep the profile only if it was slow."""
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    try:
+        return profiler.runcall(fn, *args)
+    finally:
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            path = Path(profile_dir)
+            path.mkdir(parents=True, exist_ok=True)
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{getattr(fn, '__name__', 'job')}-{elapsed:.2f}s.prof"
+            profiler.dump_stats(str(path / name))
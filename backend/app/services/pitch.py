@@ -0,0 +1,152 @@
+import numpy as np
+import librosa
+from functools import lru_cache
+from typing import Optional, Tuple
+from .analysis_context import AnalysisContext
+from .metrics import timed
+
+def _midi_to_hz(note: int) -> float:
+    return 440.0 * 2.0 ** ((note - 69) / 12)
+
+# Full search range when nothing is known about the target phoneme, C2 to C7;
+# computed here rather than with librosa.note_to_hz, which loads numba on import
+DEFAULT_F0_RANGE = (_midi_to_hz(36), _midi_to_hz(96))
+
+# "autocorr" reuses the context's STFT; "yin" is librosa's vectorized YIN;
+# "pyin" is the probabilistic tracker, most robust and by far the slowest
+PITCH_METHODS = ("autocorr", "yin", "pyin")
+
+# Frames quieter than this fraction of the loudest frame count as unvoiced
+VOICING_RMS_RATIO = 0.1
+# Minimum normalized autocorrelation peak for a voiced autocorr frame
+AUTOCORR_VOICING_THRESHOLD = 0.3
+# Earliest autocorrelation peak within this fraction of the best one wins,
+# which avoids reporting subharmonics (octave errors)
+AUTOCORR_PEAK_RATIO = 0.9
+
+def f0_range_around(fundamental: Optional[float]) -> Tuple[float, float]:
+    """Search range one octave either side of a known fundamental."""
+    if not fundamental:
+        return DEFAULT_F0_RANGE
+    fmin, fmax = DEFAULT_F0_RANGE
+    return (max(fmin, fundamental / 2), min(fmax, fundamental * 2))
+
+def search_range(
+    sr: int,
+    n_fft: int,
+    f0_range: Optional[Tuple[float, float]] = None
+) -> Tuple[float, float]:
+    """Clamp a search range to what frames of `n_fft` samples can resolve."""
+    fmin, fmax = f0_range or DEFAULT_F0_RANGE
+    # The frame must hold at least two periods of the lowest frequency
+    return max(fmin, 2 * sr / n_fft), min(fmax, sr / 4)
+
+def estimate_f0(
+    context: AnalysisContext,
+    method: str = "autocorr",
+    f0_range: Optional[Tuple[float, float]] = None
+) -> np.ndarray:
+    """Frame-level fundamental frequency in Hz, NaN for unvoiced frames."""
+    if method not in PITCH_METHODS:
+        raise ValueError(f"Unknown pitch method '{method}', expected one of {PITCH_METHODS}")
+
+    fmin, fmax = search_range(context.sr, context.n_fft, f0_range)
+    if fmin >= fmax:
+        return np.full(context.magnitude.shape[1], np.nan)
+
+    # Shared frames are computed outside the timed block
+    if method == "autocorr":
+        context.magnitude
+    context.rms
+
+    with timed(f"pitch_{method}"):
+        if method == "autocorr":
+            f0 = autocorr_f0(context.magnitude, context.sr, context.n_fft, fmin, fmax)
+            return voiced_f0(f0, context.rms)
+
+        if method == "yin":
+            f0 = librosa.yin(
+                context.y,
+                fmin=fmin,
+                fmax=fmax,
+                sr=context.sr,
+                frame_length=context.n_fft,
+                hop_length=context.hop_length
+            )
+            return voiced_f0(f0, context.rms)
+
+        f0, voiced_flag, _ = librosa.pyin(
+            context.y,
+            fmin=fmin,
+            fmax=fmax,
+            sr=context.sr,
+            frame_length=context.n_fft,
+            hop_length=context.hop_length
+        )
+        return np.where(voiced_flag, f0, np.nan)
+
+def median_f0(f0: np.ndarray) -> Optional[float]:
+    """Median over voiced frames, or None when no frame is voiced.
+
+    The median keeps isolated octave errors from skewing the summary.
+    """
+    voiced = f0[np.isfinite(f0)]
+    return float(np.median(voiced)) if len(voiced) else None
+
+def voiced_f0(f0: np.ndarray, rms: np.ndarray) -> np.ndarray:
+    """Keep estimates only in frames loud enough to be voiced."""
+    return np.where(_loud_frames(rms, len(f0)), f0, np.nan)
+
+def _loud_frames(rms: np.ndarray, n_frames: int) -> np.ndarray:
+    rms = rms[:n_frames]
+    loud = rms > VOICING_RMS_RATIO * rms.max() if len(rms) else rms.astype(bool)
+    # Pad in case the tracker produced more frames than the RMS pass
+    return np.pad(loud, (0, n_frames - len(loud)))
+
+@lru_cache(maxsize=8)
+def _window_acf(n_fft: int) -> np.ndarray:
+    window = np.hanning(n_fft + 1)[:-1]
+    return np.fft.irfft(np.abs(np.fft.rfft(window)) ** 2, n=n_fft)
+
+def autocorr_f0(magnitude: np.ndarray, sr: int, n_fft: int, fmin: float, fmax: float) -> np.ndarray:
+    """Autocorrelation pitch for all frames at once, from STFT magnitudes.
+
+    The autocorrelation is the inverse FFT of the power spectrum, so no
+    further pass over the signal is needed. It is circular at n_fft, which
+    is harmless for lags well below n_fft / 2 given the Hann window. Frames
+    are not gated by loudness here; see `voiced_f0`.
+    """
+    acf = np.fft.irfft(magnitude ** 2, n=n_fft, axis=0)
+
+    # Undo the Hann window's taper so longer lags are not penalized
+    window_acf = _window_acf(n_fft)
+
+    lag_min = max(2, int(np.floor(sr / fmax)))
+    lag_max = min(int(np.ceil(sr / fmin)), n_fft // 2 - 1)
+    lags = np.arange(lag_min - 1, lag_max + 2)  # One extra lag each side for peak picking
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        normalized = (acf[lags] / acf[0]) / (window_acf[lags, None] / window_acf[0])
+    normalized = np.nan_to_num(normalized, nan=0.0, posinf=0.0, neginf=0.0)
+
+    inner = normalized[1:-1]
+    is_peak = (inner > normalized[:-2]) & (inner >= normalized[2:])
+    peak_values = np.where(is_peak, inner, -np.inf)
+    best = peak_values.max(axis=0)
+
+    # First local maximum close enough to the best one
+    candidates = is_peak & (inner >= AUTOCORR_PEAK_RATIO * best)
+    chosen = np.argmax(candidates, axis=0)
+    frames = np.arange(inner.shape[1])
+
+    # Parabolic interpolation around the chosen lag
+    left = normalized[chosen, frames]
+    center = normalized[chosen + 1, frames]
+    right = normalized[chosen + 2, frames]
+    denominator = left - 2 * center + right
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shift = np.where(denominator != 0, 0.5 * (left - right) / denominator, 0.0)
+    lag = lags[chosen + 1] + np.clip(shift, -0.5, 0.5)
+
+    voiced = candidates.any(axis=0) & (center >= AUTOCORR_VOICING_THRESHOLD)
+    return np.where(voiced, sr / lag, np.nan)
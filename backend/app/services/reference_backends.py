@@ -0,0 +1,268 @@
+import os
+from abc import ABC, abstractmethod
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from ..models.phoneme import PhonemeReference
+
+REFERENCE_BACKENDS = ("json", "sqlite")
+
+# References whose stored data changed, and ids of references that are gone
+Changes = Tuple[List[PhonemeReference], List[str]]
+
+class ReferenceBackend(ABC):
+    """Persistent storage behind `ConfigurationStore`.
+
+    The store keeps the authoritative in-memory index; a backend only
+    persists writes and reports what other processes changed. Methods are
+    blocking and are called with the store's lock held.
+    """
+
+    @abstractmethod
+    def changed(self) -> bool:
+        """Cheap check whether storage may have changed since the last scan."""
+
+    @abstractmethod
+    def scan(self, full: bool = False) -> Changes:
+        """References changed or removed since the last scan, or all of them if `full`."""
+
+    @abstractmethod
+    def save_many(self, references: Sequence[PhonemeReference]):
+        """Persist references, atomically per reference or per batch."""
+
+    @abstractmethod
+    def delete(self, reference_id: str):
+        """Remove a reference; unknown ids are ignored."""
+
+    def close(self):
+        pass
+
+class JsonReferenceBackend(ReferenceBackend):
+    """One `{id}.json` file per reference.
+
+    Scans only re-parse files whose mtime or size changed since they were
+    last seen, and a changed directory mtime signals created or deleted files.
+    """
+
+    def __init__(self, storage_dir: Path):
+        self.storage_dir = storage_dir
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self._file_states: Dict[Path, Tuple[int, int]] = {}
+        self._file_ids: Dict[Path, str] = {}
+        self._dir_mtime: Optional[int] = None
+
+    def _path(self, reference_id: str) -> Path:
+        return self.storage_dir / f"{reference_id}.json"
+
+    def changed(self) -> bool:
+        try:
+            return self.storage_dir.stat().st_mtime_ns != self._dir_mtime
+        except FileNotFoundError:
+            return False
+
+    def scan(self, full: bool = False) -> Changes:
+        if full:
+            self._file_states.clear()
+            self._file_ids.clear()
+        try:
+            self._dir_mtime = self.storage_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            return [], []
+
+        updated: List[PhonemeReference] = []
+        removed: List[str] = []
+        seen: Set[Path] = set()
+        with os.scandir(self.storage_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                file = Path(entry.path)
+                seen.add(file)
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                state = (stat.st_mtime_ns, stat.st_size)
+                if self._file_states.get(file) == state:
+                    continue
+                self._file_states[file] = state
+                if stat.st_size == 0:
+                    continue
+
+                try:
+                    reference = PhonemeReference.parse_file(file, encoding="utf-8")
+                except Exception as e:
+                    print(f"Failed to load reference from {file}: {str(e)}")
+                    continue
+                previous_id = self._file_ids.get(file)
+                if previous_id and previous_id != reference.id:
+                    removed.append(previous_id)
+                self._file_ids[file] = reference.id
+                updated.append(reference)
+
+        for file in set(self._file_states) - seen:
+            del self._file_states[file]
+            reference_id = self._file_ids.pop(file, None)
+            if reference_id:
+                removed.append(reference_id)
+        return updated, removed
+
+    def save_many(self, references: Sequence[PhonemeReference]):
+        for reference in references:
+            file_path = self._path(reference.id)
+
+            # Write to temporary file first
+            temp_path = file_path.with_suffix('.tmp')
+            with temp_path.open('w', encoding='utf-8') as f:
+                f.write(reference.json())
+
+            # Rename temporary file to final name
+            temp_path.replace(file_path)
+
+            # Record the new file state so the next scan does not parse our own write again
+            stat = file_path.stat()
+            self._file_states[file_path] = (stat.st_mtime_ns, stat.st_size)
+            self._file_ids[file_path] = reference.id
+        self._dir_mtime = self.storage_dir.stat().st_mtime_ns
+
+    def delete(self, reference_id: str):
+        file_path = self._path(reference_id)
+        file_path.unlink(missing_ok=True)
+        self._file_states.pop(file_path, None)
+        self._file_ids.pop(file_path, None)
+        self._dir_mtime = self.storage_dir.stat().st_mtime_ns
+
+class SqliteReferenceBackend(ReferenceBackend):
+    """All references in one SQLite database in WAL mode.
+
+    Every write stamps its rows with an increasing `version`, and deletions
+    leave a tombstone row, so a scan only reads rows newer than the last one
+    seen. `PRAGMA data_version` tells whether another connection committed
+    anything at all, without touching the table.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Used from the event loop and from worker threads, one at a time
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS phoneme_references (
+                id TEXT PRIMARY KEY,
+                language TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                data TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                deleted INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS phoneme_references_language ON phoneme_references (language);
+            CREATE INDEX IF NOT EXISTS phoneme_references_symbol ON phoneme_references (symbol);
+            CREATE INDEX IF NOT EXISTS phoneme_references_version ON phoneme_references (version);
+        """)
+        self._seen_version = 0
+        self._data_version: Optional[int] = None
+
+    def _current_data_version(self) -> int:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def changed(self) -> bool:
+        with self._lock:
+            return self._current_data_version() != self._data_version
+
+    def scan(self, full: bool = False) -> Changes:
+        with self._lock:
+            self._data_version = self._current_data_version()
+            if full:
+                self._seen_version = self._max_version()
+                rows = self._conn.execute(
+                    "SELECT id, data, version, deleted FROM phoneme_references WHERE deleted = 0 ORDER BY rowid"
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT id, data, version, deleted FROM phoneme_references WHERE version > ? ORDER BY version",
+                    (self._seen_version,)
+                ).fetchall()
+
+        updated: List[PhonemeReference] = []
+        removed: List[str] = []
+        for reference_id, data, version, deleted in rows:
+            self._seen_version = max(self._seen_version, version)
+            if deleted:
+                removed.append(reference_id)
+                continue
+            try:
+                updated.append(PhonemeReference.parse_raw(data))
+            except Exception as e:
+                print(f"Failed to load reference {reference_id}: {str(e)}")
+        return updated, removed
+
+    def _max_version(self) -> int:
+        return self._conn.execute("SELECT COALESCE(MAX(version), 0) FROM phoneme_references").fetchone()[0]
+
+    def save_many(self, references: Sequence[PhonemeReference]):
+        if not references:
+            return
+        with self._lock:
+            # One transaction, so a batch is all-or-nothing and costs one fsync
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                version = self._max_version()
+                self._conn.executemany(
+                    """
+                    INSERT INTO phoneme_references (id, language, symbol, data, version, deleted)
+                    VALUES (?, ?, ?, ?, ?, 0)
+                    ON CONFLICT (id) DO UPDATE SET
+                        language = excluded.language,
+                        symbol = excluded.symbol,
+                        data = excluded.data,
+                        version = excluded.version,
+                        deleted = 0
+                    """,
+                    [
+                        (reference.id, reference.language, reference.symbol, reference.json(), version + i)
+                        for i, reference in enumerate(references, start=1)
+                    ]
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._mark_own_write(version, version + len(references))
+
+    def delete(self, reference_id: str):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                previous = self._max_version()
+                version = previous + 1
+                self._conn.execute(
+                    "UPDATE phoneme_references SET deleted = 1, data = '', version = ? WHERE id = ?",
+                    (version, reference_id)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._mark_own_write(previous, version)
+
+    def _mark_own_write(self, previous: int, version: int):
+        # Skip our own rows on the next scan, unless rows from another process
+        # came before them that have not been scanned yet
+        if self._seen_version == previous:
+            self._seen_version = version
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def create_backend(name: str, storage_dir: Path, db_path: Path) -> ReferenceBackend:
+    """Backend selected by name, one of REFERENCE_BACKENDS."""
+    if name == "json":
+        return JsonReferenceBackend(storage_dir)
+    if name == "sqlite":
+        return SqliteReferenceBackend(db_path)
+    raise ValueError(f"Unknown reference backend '{name}', expected one of {REFERENCE_BACKENDS}")
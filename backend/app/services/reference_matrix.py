@@ -0,0 +1,84 @@
+import numpy as np
+from typing import List, NamedTuple, Optional, Tuple
+from ..models.audio import AudioFeatures
+from ..models.phoneme import PhonemeReference
+from .configuration_store import ConfigurationStore
+from .feature_extractor import FeatureExtractor
+
+class _Snapshot(NamedTuple):
+    version: Optional[int]
+    references: List[PhonemeReference]
+    languages: np.ndarray
+    symbols: np.ndarray
+    matrix: np.ndarray
+
+_EMPTY = _Snapshot(
+    None, [], np.empty(0, dtype=object), np.empty(0, dtype=object), np.empty((0, 6), dtype=np.float64)
+)
+
+class ReferenceMatrix:
+    """NumPy view of every reference with extracted features.
+
+    Rows hold `FeatureExtractor.feature_vector` of each reference, so scoring
+    a recording against N references is one vectorized operation. The matrix
+    is rebuilt only when the configuration store's version changes.
+
+    Each rebuild produces a new immutable snapshot that replaces the old one
+    in a single assignment, so callers on other threads always see a
+    reference list and a matrix that belong together.
+    """
+
+    def __init__(self, store: ConfigurationStore, feature_extractor: FeatureExtractor):
+        self.store = store
+        self.feature_extractor = feature_extractor
+        self._snapshot = _EMPTY
+
+    def _current(self) -> _Snapshot:
+        self.store.refresh()
+        snapshot = self._snapshot
+        if snapshot.version == self.store.version:
+            return snapshot
+
+        version, references = self.store.versioned_references()
+        references = [ref for ref in references if ref.features]
+        snapshot = _Snapshot(
+            version=version,
+            references=references,
+            languages=np.array([ref.language for ref in references], dtype=object),
+            symbols=np.array([ref.symbol for ref in references], dtype=object),
+            matrix=np.array(
+                [self.feature_extractor.feature_vector(ref.features) for ref in references],
+                dtype=np.float64
+            ).reshape(len(references), 6)
+        )
+        self._snapshot = snapshot
+        return snapshot
+
+    def top_matches(
+        self,
+        features: AudioFeatures,
+        top_k: int = 5,
+        language: Optional[str] = None,
+        symbol: Optional[str] = None
+    ) -> List[Tuple[PhonemeReference, float]]:
+        """Return the `top_k` best-scoring references, highest score first."""
+        snapshot = self._current()
+
+        mask = np.ones(len(snapshot.references), dtype=bool)
+        if language is not None:
+            mask &= snapshot.languages == language
+        if symbol is not None:
+            mask &= snapshot.symbols == symbol
+        candidates = np.flatnonzero(mask)
+        if len(candidates) == 0 or top_k <= 0:
+            return []
+
+        scores = self.feature_extractor.calculate_similarity_matrix(
+            features, snapshot.matrix[candidates]
+        )
+
+        # Partial selection of the k best, then sort only those
+        k = min(top_k, len(candidates))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(snapshot.references[candidates[i]], float(scores[i])) for i in best]
@@ -0,0 +1,72 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+from .metrics import metrics
+
+class ResultCache:
+    """In-memory LRU of scored results, bounded by entry count and age.
+
+    Entries are keyed by `(key, reference_id)`, where `key` identifies the
+    uploaded content and scoring parameters. `invalidate(reference_id)` drops
+    every result scored against a reference, so the cache can be registered
+    as a `ConfigurationStore` listener.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0, name: str = "result_cache"):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.name = name
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[Hashable, str], Tuple[float, Any]]" = OrderedDict()
+        self._by_reference: Dict[str, Set[Tuple[Hashable, str]]] = {}
+        metrics.set_gauge(f"{name}_entries", lambda: len(self))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, reference_id: str) -> Optional[Any]:
+        """Cached value, or None when missing or older than `ttl`."""
+        entry_key = (key, reference_id)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl:
+                self._remove(entry_key)
+                entry = None
+            if entry is None:
+                metrics.inc(f"{self.name}_requests", result="miss")
+                return None
+            self._entries.move_to_end(entry_key)
+        metrics.inc(f"{self.name}_requests", result="hit")
+        return entry[1]
+
+    def put(self, key: Hashable, reference_id: str, value: Any):
+        if self.max_entries <= 0:
+            return
+        entry_key = (key, reference_id)
+        with self._lock:
+            self._entries[entry_key] = (time.monotonic(), value)
+            self._entries.move_to_end(entry_key)
+            self._by_reference.setdefault(reference_id, set()).add(entry_key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                metrics.inc(f"{self.name}_evictions")
+
+    def invalidate(self, reference_id: str):
+        """Drop every result scored against `reference_id`."""
+        with self._lock:
+            for entry_key in self._by_reference.pop(reference_id, set()):
+                self._entries.pop(entry_key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_reference.clear()
+
+    def _remove(self, entry_key: Tuple[Hashable, str]):
+        self._entries.pop(entry_key, None)
+        keys = self._by_reference.get(entry_key[1])
+        if keys is not None:
+            keys.discard(entry_key)
+            if not keys:
+                del self._by_reference[entry_key[1]]
@@ -0,0 +1,170 @@
+import numpy as np
+from typing import List, Optional, Tuple
+from ..models.phoneme import PhonemeFeatures
+from .feature_extractor import FeatureExtractor
+from .pitch import autocorr_f0, median_f0, search_range, voiced_f0
+
+class StreamingAnalyzer:
+    """Frame-level feature analysis of audio that arrives in chunks.
+
+    Each call to `push()` analyzes only the frames completed by the new
+    samples, all at once, so per-chunk work and memory are bounded by the
+    chunk length and earlier audio is never revisited. Frames line up with
+    the centered STFT of `AnalysisContext`: the first frame is centered on
+    the first sample and `flush()` adds the trailing frames, so a flushed
+    clip at the extractor's sample rate has the same frames as offline
+    analysis. Whole-clip features are kept as running sums and summarized
+    with the same rules as `FeatureExtractor`.
+
+    With `keep_frames`, the RMS and autocorrelation F0 of every frame are
+    also kept (8 bytes per frame, about 0.6 MB per hour of audio) so the
+    fundamental can be estimated with the same loudness gating as offline.
+    `track_f0=False` keeps only the RMS and skips the pitch search.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        feature_extractor: FeatureExtractor,
+        keep_frames: bool = False,
+        f0_range: Optional[Tuple[float, float]] = None,
+        track_f0: bool = True
+    ):
+        self.sample_rate = sample_rate
+        self.feature_extractor = feature_extractor
+        self.keep_frames = keep_frames
+        self.track_f0 = track_f0
+
+        # Keep the extractor's window duration at the incoming sample rate
+        scale = sample_rate / feature_extractor.sample_rate
+        self.n_fft = int(2 ** np.round(np.log2(feature_extractor.n_fft * scale)))
+        self.hop_length = self.n_fft * feature_extractor.hop_length // feature_extractor.n_fft
+
+        self._window = np.hanning(self.n_fft + 1)[:-1]  # Periodic Hann, as in the STFT
+        # Only keep bins below the extractor's Nyquist frequency, so centroid and
+        # frequency range match features of audio resampled for offline analysis
+        freqs = np.fft.rfftfreq(self.n_fft, d=1.0 / sample_rate)
+        self._n_bins = int(np.searchsorted(freqs, feature_extractor.sample_rate / 2, side="right"))
+        self._freqs = freqs[:self._n_bins]
+        self._f0_range = search_range(sample_rate, self.n_fft, f0_range)
+
+        # Samples from the start of the next frame on; starts with the
+        # half-window of zeros a centered STFT pads in front of the signal
+        self._buffer = np.zeros(self.n_fft // 2, dtype=np.float64)
+        self._flushed = False
+
+        # Running whole-clip statistics
+        self.samples_seen = 0
+        self.frame_count = 0
+        self._rms_sum = 0.0
+        self._centroid_sum = 0.0
+        self._spectrum_sum = np.zeros(len(self._freqs), dtype=np.float64)
+
+        # Frame values produced since the last drain
+        self._new_rms: List[float] = []
+        self._last_rms = 0.0
+        self._last_centroid = 0.0
+
+        # Per-frame history, only with keep_frames
+        self._rms_blocks: List[np.ndarray] = []
+        self._f0_blocks: List[np.ndarray] = []
+
+    def push(self, samples: np.ndarray) -> int:
+        """Add mono samples and analyze every frame they complete.
+
+        Returns the number of new frames.
+        """
+        if self._flushed:
+            raise ValueError("Cannot push samples after flush()")
+        self.samples_seen += len(samples)
+        return self._consume(samples)
+
+    def flush(self) -> int:
+        """Analyze the trailing frames that overlap the end of the audio.
+
+        Call once, after the last `push()`; returns the number of new frames.
+        """
+        if self._flushed:
+            return 0
+        self._flushed = True
+        return self._consume(np.zeros(self.n_fft // 2, dtype=np.float64))
+
+    def _consume(self, samples: np.ndarray) -> int:
+        buffer = np.concatenate((self._buffer, samples.astype(np.float64, copy=False)))
+        n_frames = max(0, (len(buffer) - self.n_fft) // self.hop_length + 1)
+        if n_frames:
+            frames = np.lib.stride_tricks.sliding_window_view(buffer, self.n_fft)[::self.hop_length][:n_frames]
+            self._analyze_frames(frames)
+        self._buffer = buffer[n_frames * self.hop_length:]
+        return n_frames
+
+    def _analyze_frames(self, frames: np.ndarray):
+        """Analyze a (frames, n_fft) block of overlapping frames."""
+        rms = np.sqrt(np.mean(frames ** 2, axis=1))
+        spectrum = np.abs(np.fft.rfft(frames * self._window, axis=1))
+        magnitude = spectrum[:, :self._n_bins]
+        total = magnitude.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            centroid = np.where(total > 0, magnitude @ self._freqs / total, 0.0)
+
+        self.frame_count += len(frames)
+        self._rms_sum += float(rms.sum())
+        self._centroid_sum += float(centroid.sum())
+        self._spectrum_sum += magnitude.sum(axis=0)
+        self._new_rms.extend(rms.tolist())
+        self._last_rms = float(rms[-1])
+        self._last_centroid = float(centroid[-1])
+
+        if self.keep_frames:
+            self._rms_blocks.append(rms.astype(np.float32))
+        if self.keep_frames and self.track_f0:
+            fmin, fmax = self._f0_range
+            f0 = (autocorr_f0(spectrum.T, self.sample_rate, self.n_fft, fmin, fmax)
+                  if fmin < fmax else np.full(len(frames), np.nan))
+            self._f0_blocks.append(f0.astype(np.float32))
+
+    @property
+    def duration(self) -> float:
+        return self.samples_seen / self.sample_rate
+
+    @property
+    def current_rms(self) -> float:
+        return self._last_rms
+
+    @property
+    def current_centroid(self) -> float:
+        return self._last_centroid
+
+    @property
+    def rms_frames(self) -> np.ndarray:
+        """RMS of every frame so far; requires `keep_frames`."""
+        return np.concatenate(self._rms_blocks) if self._rms_blocks else np.empty(0, dtype=np.float32)
+
+    @property
+    def spectrum(self) -> np.ndarray:
+        """Mean magnitude spectrum over the frames so far."""
+        return self._spectrum_sum / max(self.frame_count, 1)
+
+    def drain_envelope(self) -> List[float]:
+        """Frame RMS values produced since the previous call."""
+        values, self._new_rms = self._new_rms, []
+        return values
+
+    def fundamental(self) -> Optional[float]:
+        """Median F0 of voiced frames so far; requires `keep_frames`."""
+        if not self._f0_blocks:
+            return None
+        return median_f0(voiced_f0(np.concatenate(self._f0_blocks), self.rms_frames))
+
+    def features(self) -> Optional[PhonemeFeatures]:
+        """Whole-clip features for the audio received so far."""
+        if self.frame_count == 0:
+            return None
+        return self.feature_extractor.summarize(
+            freq_profile=self.spectrum,
+            mean_rms=self._rms_sum / self.frame_count,
+            centroid=self._centroid_sum / self.frame_count,
+            duration=self.duration,
+            sample_rate=self.feature_extractor.sample_rate,
+            fundamental=self.fundamental() if self.keep_frames else None
+        )
@@ -0,0 +1,73 @@
+from pathlib import Path
+from pydantic import BaseSettings
+
+class Settings(BaseSettings):
+    """Runtime configuration, overridable through SPEECH_* environment variables."""
+
+    # Analysis process pool
+    analysis_workers: int | None = None  # Defaults to the number of CPUs
+    analysis_max_queue: int = 16  # Jobs allowed to wait beyond the busy workers
+    analysis_timeout: float = 30.0  # Seconds before a single job is abandoned
+
+    # Run a synthetic clip through every worker at startup; /ready reports
+    # 503 until this finishes
+    warm_up: bool = True
+
+    # Sampled cProfile capture of analysis jobs; only jobs slower than
+    # profile_min_seconds are written to profile_dir
+    profile_sample_rate: float = 0.0
+    profile_dir: Path = Path("data/profiles")
+    profile_min_seconds: float = 1.0
+
+    # F0 estimator: "autocorr" (fastest), "yin" or "pyin" (most robust, slowest)
+    pitch_method: str = "autocorr"
+
+    # Decoding: resampler used to reach the 22050 Hz analysis rate, one of
+    # audio_decoder.RESAMPLE_TYPES ("soxr_qq" fastest, "soxr_vhq" best), and
+    # limits checked from the file header before decoding
+    resample_type: str = "soxr_hq"
+    max_audio_duration: float | None = 600.0  # Seconds
+    max_audio_channels: int | None = 2
+    max_upload_bytes: int = 64 * 1024 * 1024  # Also per archive and per archive member
+    max_archive_bytes: int = 512 * 1024 * 1024  # Decompressed total of an uploaded archive
+    # Longer recordings are analyzed block by block, so memory use does not
+    # grow with their length; they get no DTW trajectories
+    stream_analysis_after: float | None = 30.0  # Seconds
+
+    # Voice-activity trimming: frames more than trim_threshold_db below the
+    # loudest frame are silence, cut before analysis apart from trim_padding
+    # seconds around the voiced region; None disables trimming
+    trim_threshold_db: float | None = 40.0
+    trim_padding: float = 0.1  # Seconds
+
+    # Envelope and spectrum curves in /api/audio/analyze responses: default
+    # length, and the most a client may ask for with ?points=
+    visualization_points: int = 100
+    max_visualization_points: int = 4096
+
+    # In-memory LRU of /api/audio/analyze responses for repeated uploads;
+    # a size of 0 disables it
+    result_cache_size: int = 1024
+    result_cache_ttl: float = 300.0  # Seconds
+
+    # Reference storage: "json" (one file per reference in config_dir) or
+    # "sqlite" (reference_db); frame trajectories stay in config_dir.
+    # Existing JSON references are imported with `python -m app.cli migrate`
+    reference_backend: str = "json"
+    config_dir: Path = Path("data/configurations")
+    reference_db: Path = Path("data/references.db")
+
+    # Append-only log of scored attempts, written in the background, with
+    # per-user, per-phoneme aggregates; progress_alpha weights the latest
+    # attempt in the rolling mean and trend
+    attempt_log_db: Path = Path("data/attempts.db")
+    attempt_log_queue: int = 10000
+    progress_alpha: float = 0.2
+
+    # Content-addressed cache of extracted reference features
+    feature_cache_dir: Path = Path("data/feature_cache")
+
+    class Config:
+        env_prefix = "SPEECH_"
+
+settings = Settings()
@@ -0,0 +1 @@
+"""Offline benchmarks for the analysis stack; run from the backend directory."""
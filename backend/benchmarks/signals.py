@@ -0,0 +1,66 @@
+"""Synthetic test signals with known ground truth, so benchmarks need no recordings."""
+import io
+import numpy as np
+import soundfile as sf
+
+def harmonic_tone(
+    f0: float,
+    duration: float,
+    sr: int = 22050,
+    n_harmonics: int = 8,
+    vibrato_depth: float = 0.0,
+    vibrato_rate: float = 5.5,
+    glide_to: float | None = None,
+    snr_db: float | None = None,
+    seed: int = 0
+) -> tuple[np.ndarray, np.ndarray]:
+    """Voiced, vowel-like tone with a 1/k harmonic roll-off.
+
+    Returns the signal and its instantaneous F0 per sample. `vibrato_depth`
+    is a fraction of f0, `glide_to` sweeps linearly to a second frequency and
+    `snr_db` adds white noise.
+    """
+    t = np.arange(int(duration * sr)) / sr
+    target = glide_to if glide_to is not None else f0
+    f0_track = f0 + (target - f0) * t / max(duration, 1e-9)
+    f0_track = f0_track * (1 + vibrato_depth * np.sin(2 * np.pi * vibrato_rate * t))
+    phase = 2 * np.pi * np.cumsum(f0_track) / sr
+
+    y = np.zeros_like(t)
+    for k in range(1, n_harmonics + 1):
+        # Skip harmonics above Nyquist at the highest instantaneous F0
+        if k * f0_track.max() < sr / 2:
+            y += np.sin(k * phase) / k
+    y *= 0.3 / np.abs(y).max()
+
+    if snr_db is not None:
+        y = add_noise(y, snr_db, seed)
+    return y.astype(np.float32), f0_track
+
+def noise(duration: float, sr: int = 22050, level: float = 0.1, seed: int = 0) -> np.ndarray:
+    """White noise, e.g. a fricative-like unvoiced signal."""
+    rng = np.random.default_rng(seed)
+    return (level * rng.standard_normal(int(duration * sr))).astype(np.float32)
+
+def add_noise(y: np.ndarray, snr_db: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    signal_power = np.mean(y ** 2)
+    noise_power = signal_power / (10 ** (snr_db / 10))
+    return y + rng.standard_normal(len(y)) * np.sqrt(noise_power)
+
+def phoneme_like(duration: float, sr: int = 22050, f0: float = 140.0, seed: int = 0) -> np.ndarray:
+    """Silence, a short fricative burst, a voiced vowel with an attack/decay, then silence."""
+    lead = int(0.15 * duration * sr)
+    burst = noise(0.1 * duration, sr, level=0.05, seed=seed)
+    vowel, _ = harmonic_tone(f0, 0.6 * duration, sr, vibrato_depth=0.01, seed=seed)
+    vowel *= np.hanning(len(vowel))
+    tail = int(duration * sr) - lead - len(burst) - len(vowel)
+    return np.concatenate([
+        np.zeros(lead, dtype=np.float32), burst, vowel, np.zeros(max(tail, 0), dtype=np.float32)
+    ])
+
+def to_wav_bytes(y: np.ndarray, sr: int) -> bytes:
+    """Encode as 16-bit PCM WAV, the format the browser client uploads."""
+    buffer = io.BytesIO()
+    sf.write(buffer, y, sr, format="WAV", subtype="PCM_16")
+    return buffer.getvalue()
@@ -0,0 +1,234 @@
+"""Latency, throughput and memory benchmarks for the analysis stack.
+
+    python -m benchmarks.suite [--quick] [--save-baseline baseline.json]
+    python -m benchmarks.suite --baseline baseline.json [--threshold 0.25]
+
+Every input is synthesized (tones, noise, phoneme-like clips at several
+durations and sample rates), so no recordings, microphones or network are
+needed. With --baseline the run exits non-zero when any stage's median
+latency or peak memory regresses beyond the threshold. F0 estimator accuracy
+is covered separately by benchmarks.pitch_benchmark.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+import numpy as np
+from app.models.audio import AudioFeatures
+from app.services.analysis_context import AnalysisContext
+from app.services.audio_decoder import AudioDecoder
+from app.services.feature_extractor import FeatureExtractor
+from app.services.formants import lpc_formants
+from .signals import harmonic_tone, noise, phoneme_like, to_wav_bytes
+
+DURATIONS = (0.5, 2.0, 10.0)
+SAMPLE_RATES = (16000, 44100, 48000)
+QUICK_DURATIONS = (0.5, 2.0)
+QUICK_SAMPLE_RATES = (44100,)
+
+# Differences below these floors are treated as timer/allocator noise
+LATENCY_FLOOR_MS = 1.0
+MEMORY_FLOOR_MB = 1.0
+
+def make_signals(duration: float, sr: int) -> Dict[str, np.ndarray]:
+    return {
+        "tone": harmonic_tone(180.0, duration, sr)[0],
+        "noise": noise(duration, sr),
+        "phoneme": phoneme_like(duration, sr)
+    }
+
+def measure(fn: Callable[[], object], repeats: int) -> dict:
+    """Latency over `repeats` runs plus peak traced memory of one extra run."""
+    fn()  # Warm-up: imports, numba compilation, FFT plans
+
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "median_ms": 1000 * float(np.median(timings)),
+        "p95_ms": 1000 * float(np.percentile(timings, 95)),
+        "peak_mb": peak / 2 ** 20
+    }
+
+def stage_benchmarks(wav: bytes, extractor: FeatureExtractor) -> Dict[str, Callable[[], object]]:
+    """Callables for each stage, all starting from the same uploaded bytes."""
+    context = AnalysisContext.from_bytes(wav, extractor.decoder)
+    y, sr = context.y, context.sr
+    features = extractor.extract_features_from_context(context)
+    audio_features = AudioFeatures(**features.dict(include=set(AudioFeatures.__fields__)))
+
+    # A reference set the size of a large phoneme inventory
+    rng = np.random.default_rng(0)
+    reference_matrix = extractor.feature_vector(features) * rng.uniform(0.5, 1.5, (1000, 6))
+
+    frames = extractor.extract_frames(context)
+    reference_frames = extractor.extract_frames(
+        AnalysisContext(phoneme_like(1.0, extractor.sample_rate), extractor.sample_rate)
+    )
+
+    quick_decoder = AudioDecoder(extractor.sample_rate, "soxr_qq")
+
+    return {
+        "decode": lambda: extractor.decoder.decode(wav),
+        "decode_soxr_qq": lambda: quick_decoder.decode(wav),
+        "stft": lambda: AnalysisContext(y, sr).magnitude,
+        # LPC formants alone, on an STFT already computed, to compare with "stft"
+        "formants": lambda: lpc_formants(context.magnitude, sr, context.n_fft),
+        "extract_features": lambda: extractor.extract_features_from_context(AnalysisContext(y, sr)),
+        # Trimming then extracting, as the analysis engine does
+        "trim_extract_features": lambda: extractor.extract_features_from_context(
+            extractor.trim(AnalysisContext(y, sr))
+        ),
+        # Only what an envelope display needs: no STFT, no pitch tracking
+        "extract_rms_only": lambda: extractor.extract(AnalysisContext(y, sr), {"rms"}),
+        "similarity": lambda: extractor.calculate_similarity(audio_features, features),
+        "similarity_matrix_1000": lambda: extractor.calculate_similarity_matrix(audio_features, reference_matrix),
+        "extract_frames": lambda: extractor.extract_frames(AnalysisContext(y, sr)),
+        # Against a 1-second reference, as when scoring an attempt
+        "similarity_dtw": lambda: extractor.calculate_trajectory_similarity(frames, reference_frames)
+    }
+
+def route_benchmark(
+    reference_wav: bytes,
+    stack: contextlib.ExitStack
+) -> Callable[[bytes, bool], Callable[[], object]] | None:
+    """POST /api/audio/analyze through the ASGI app, or None without httpx.
+
+    Every repeat posts the same bytes, so unless `cached` the result cache
+    is cleared before each request and the full analysis is measured.
+    """
+    try:
+        from fastapi.testclient import TestClient
+    except (ImportError, RuntimeError):
+        print("Skipping route benchmark: fastapi.testclient needs httpx", file=sys.stderr)
+        return None
+
+    # The app keeps its data under ./data, so run it in a scratch directory
+    os.chdir(tempfile.mkdtemp(prefix="speech-bench-"))
+    from app.main import app
+    from app.dependencies import result_cache
+
+    client = stack.enter_context(TestClient(app))
+    response = client.post(
+        "/api/config/reference-audio",
+        files={"audio": ("reference.wav", reference_wav, "audio/wav")},
+        data={"metadata": json.dumps({"language": "bench", "symbol": "a"})}
+    )
+    client.post(f"/api/config/extract-features/{response.json()['id']}")
+
+    def post(wav: bytes, cached: bool = False) -> Callable[[], object]:
+        def run():
+            if not cached:
+                result_cache.clear()
+            response = client.post(
+                "/api/audio/analyze",
+                files={"file": ("recording.wav", wav, "audio/wav")}
+            )
+            response.raise_for_status()
+        return run
+    return post
+
+def run_suite(durations, sample_rates, repeats: int, include_route: bool) -> Dict[str, dict]:
+    extractor = FeatureExtractor()
+    stack = contextlib.ExitStack()
+    route = None
+    if include_route:
+        route = route_benchmark(to_wav_bytes(harmonic_tone(180.0, 1.0, 44100)[0], 44100), stack)
+
+    results = {}
+    with stack:
+        _run_cases(durations, sample_rates, repeats, extractor, route, results)
+    return results
+
+def _run_cases(durations, sample_rates, repeats, extractor, route, results):
+    for sr in sample_rates:
+        for duration in durations:
+            for name, y in make_signals(duration, sr).items():
+                wav = to_wav_bytes(y, sr)
+                stages = stage_benchmarks(wav, extractor)
+                if route is not None:
+                    stages["route_analyze"] = route(wav)
+                    # Repeated uploads answered from the result cache
+                    stages["route_analyze_cached"] = route(wav, cached=True)
+
+                for stage, fn in stages.items():
+                    key = f"{stage}/{name}_{duration:g}s_{sr}"
+                    result = measure(fn, repeats)
+                    result["audio_seconds_per_second"] = duration / (result["median_ms"] / 1000)
+                    results[key] = result
+                    print(
+                        f"{key:<48} {result['median_ms']:>9.2f} ms  "
+                        f"p95 {result['p95_ms']:>9.2f} ms  "
+                        f"{result['audio_seconds_per_second']:>9.1f} x realtime  "
+                        f"peak {result['peak_mb']:>7.1f} MB",
+                        file=sys.stderr
+                    )
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """Describe every stage that got slower or hungrier than the baseline allows."""
+    regressions = []
+    for key, base in baseline.items():
+        current = results.get(key)
+        if current is None:
+            continue
+        for metric, floor, unit in (("median_ms", LATENCY_FLOOR_MS, "ms"), ("peak_mb", MEMORY_FLOOR_MB, "MB")):
+            limit = base[metric] * (1 + threshold)
+            if current[metric] > limit and current[metric] - base[metric] > floor:
+                regressions.append(
+                    f"{key}: {metric} {current[metric]:.2f} {unit} > "
+                    f"{base[metric]:.2f} {unit} baseline (+{threshold:.0%} allowed)"
+                )
+    return regressions
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    parser.add_argument("--quick", action="store_true", help="Fewer durations and sample rates")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--no-route", action="store_true", help="Skip the full HTTP route stage")
+    parser.add_argument("--save-baseline", type=Path, help="Write results to this file")
+    parser.add_argument("--baseline", type=Path, help="Compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative regression")
+    parser.add_argument("--output", type=Path, help="Write this run's results as JSON")
+    args = parser.parse_args(argv)
+
+    # Resolve paths before the route benchmark changes directory
+    save_baseline = args.save_baseline.resolve() if args.save_baseline else None
+    baseline_path = args.baseline.resolve() if args.baseline else None
+    output = args.output.resolve() if args.output else None
+
+    results = run_suite(
+        QUICK_DURATIONS if args.quick else DURATIONS,
+        QUICK_SAMPLE_RATES if args.quick else SAMPLE_RATES,
+        args.repeats,
+        include_route=not args.no_route
+    )
+
+    for path in (save_baseline, output):
+        if path is not None:
+            path.write_text(json.dumps(results, indent=2, sort_keys=True))
+
+    if baseline_path is not None:
+        regressions = compare(results, json.loads(baseline_path.read_text()), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions against {baseline_path}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
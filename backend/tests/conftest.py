@@ -0,0 +1,25 @@
+import os
+import shutil
+import tempfile
+import pytest
+
+# Settings and the shared services in app.dependencies are created when app
+# modules are first imported, with data paths relative to the working
+# directory, so point them at a scratch directory before any test module
+# is collected
+_cwd = os.getcwd()
+_data_root = tempfile.mkdtemp(prefix="speech-tests-")
+os.chdir(_data_root)
+os.environ["SPEECH_WARM_UP"] = "false"
+
+def pytest_unconfigure(config):
+    os.chdir(_cwd)
+    shutil.rmtree(_data_root, ignore_errors=True)
+
+@pytest.fixture(scope="session")
+def client():
+    """A client of the app, shared because shutdown closes the shared services."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    with TestClient(app) as client:
+        yield client
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from app.services.analysis_context import AnalysisContext
+
+SR = 22050
+
+def padded_tone(before: float, tone: float, after: float, noise: float = 0.0) -> np.ndarray:
+    t = np.arange(int(SR * tone)) / SR
+    y = np.concatenate([np.zeros(int(SR * before)), 0.3 * np.sin(2 * np.pi * 220 * t), np.zeros(int(SR * after))])
+    y += noise * np.random.default_rng(0).standard_normal(len(y))
+    return y.astype(np.float32)
+
+def test_trims_to_the_voiced_region_with_padding():
+    context = AnalysisContext(padded_tone(1.0, 0.5, 2.0, noise=1e-4), SR)
+    trimmed = context.trimmed(threshold_db=40.0, padding=0.1)
+
+    # Frames are a window long, so the cut may reach about half a window
+    # further out than the padding
+    slack = context.n_fft / SR
+    assert trimmed.duration == pytest.approx(0.5 + 2 * 0.1, abs=slack)
+    start = np.flatnonzero(context.y == trimmed.y[0])[0] / SR
+    assert start == pytest.approx(1.0 - 0.1, abs=slack)
+    assert (trimmed.sr, trimmed.n_fft, trimmed.hop_length) == (context.sr, context.n_fft, context.hop_length)
+
+def test_trimmed_samples_are_a_view():
+    context = AnalysisContext(padded_tone(1.0, 0.5, 1.0), SR)
+    assert np.shares_memory(context.trimmed().y, context.y)
+
+def test_padding_is_kept_within_the_clip():
+    context = AnalysisContext(padded_tone(0.02, 0.5, 0.02), SR)
+    assert context.trimmed(padding=0.5) is context
+
+def test_silence_is_not_trimmed():
+    context = AnalysisContext(np.zeros(SR, dtype=np.float32), SR)
+    assert context.trimmed() is context
+
+def test_lower_threshold_keeps_quieter_audio():
+    # A loud tone, then a tone 30 dB quieter
+    t = np.arange(SR // 2) / SR
+    tone = np.sin(2 * np.pi * 220 * t)
+    y = np.concatenate([np.zeros(SR), 0.5 * tone, 0.5 * 10 ** (-30 / 20) * tone, np.zeros(SR)]).astype(np.float32)
+    context = AnalysisContext(y, SR)
+    assert context.trimmed(threshold_db=20.0, padding=0.0).duration == pytest.approx(0.5, abs=0.1)
+    assert context.trimmed(threshold_db=40.0, padding=0.0).duration == pytest.approx(1.0, abs=0.1)
@@ -0,0 +1,105 @@
+import asyncio
+import io
+import os
+import time
+import numpy as np
+import pytest
+import soundfile as sf
+from app.dependencies import analysis_engine
+from app.services.analysis_engine import AnalysisEngine, AnalysisQueueFull, AnalysisTimeout
+from app.services.feature_extractor import FeatureExtractor
+
+@pytest.fixture
+def engine():
+    engine = AnalysisEngine(FeatureExtractor(), max_workers=1, max_queue=1, timeout=5.0)
+    yield engine
+    engine.shutdown()
+
+def wav(duration: float = 0.5, sr: int = 22050) -> bytes:
+    t = np.arange(int(sr * duration)) / sr
+    buffer = io.BytesIO()
+    sf.write(buffer, (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32), sr, format="WAV")
+    return buffer.getvalue()
+
+def test_analyze_runs_on_a_worker(engine):
+    result = asyncio.run(engine.analyze(wav(), frames=False))
+    assert result.values.duration == pytest.approx(0.5)
+    assert result.frames is None
+
+def test_full_queue_is_refused(engine):
+    async def run():
+        # One job running and one waiting fill the pool
+        jobs = [asyncio.create_task(engine.submit(time.sleep, 0.3)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(AnalysisQueueFull):
+            await engine.submit(os.getpid)
+        await asyncio.gather(*jobs)
+        # Capacity is released as jobs finish
+        assert await engine.submit(os.getpid) > 0
+
+    asyncio.run(run())
+
+def test_slow_job_times_out():
+    engine = AnalysisEngine(FeatureExtractor(), max_workers=1, max_queue=1, timeout=0.2)
+    try:
+        with pytest.raises(AnalysisTimeout):
+            asyncio.run(engine.submit(time.sleep, 2.0))
+    finally:
+        engine.shutdown()
+
+def test_waiting_submissions_all_run(engine):
+    async def run():
+        started = time.perf_counter()
+        results = await asyncio.gather(*(engine.submit(time.sleep, 0.1, wait=True) for _ in range(5)))
+        return results, time.perf_counter() - started
+
+    results, elapsed = asyncio.run(run())
+    assert results == [None] * 5
+    # One worker runs them one after another
+    assert elapsed >= 0.5
+    assert engine._in_flight == 0
+
+def test_waiting_yields_to_interactive_requests(engine):
+    async def run():
+        order = []
+
+        async def job(name, wait):
+            await engine.submit(time.sleep, 0.1, wait=wait)
+            order.append(name)
+
+        bulk = [asyncio.create_task(job(f"bulk{i}", True)) for i in range(4)]
+        await asyncio.sleep(0.05)
+        # The queue is full, so this one is refused rather than waiting
+        with pytest.raises(AnalysisQueueFull):
+            await engine.submit(os.getpid)
+        await asyncio.gather(*bulk)
+        return order
+
+    # Waiting submissions get slots in the order they asked
+    assert asyncio.run(run()) == ["bulk0", "bulk1", "bulk2", "bulk3"]
+
+def test_cancelled_waiter_passes_its_slot_on(engine):
+    async def run():
+        running = [asyncio.create_task(engine.submit(time.sleep, 0.2)) for _ in range(2)]
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(engine.submit(os.getpid, wait=True)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        waiters[0].cancel()
+        await asyncio.gather(*running)
+        return await asyncio.wait_for(waiters[1], 5.0)
+
+    assert asyncio.run(run()) > 0
+
+@pytest.mark.parametrize("error, status", [
+    (AnalysisQueueFull("Analysis queue is full (16 waiting jobs)"), 503),
+    (AnalysisTimeout("Analysis did not finish within 30.0s"), 504),
+])
+def test_errors_map_to_http_status(client, monkeypatch, error, status):
+    async def fail(*args, **kwargs):
+        raise error
+
+    monkeypatch.setattr(analysis_engine, "analyze", fail)
+    response = client.post("/api/audio/features", files={"file": ("clip.wav", wav(), "audio/wav")})
+    assert response.status_code == status
+    assert response.json() == {"detail": str(error)}
+    assert response.headers.get("retry-after") == ("1" if status == 503 else None)
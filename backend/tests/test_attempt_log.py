@@ -0,0 +1,77 @@
+import pytest
+from app.models.progress import Attempt
+from app.services.attempt_log import AttemptLog
+
+ALPHA = 0.5
+
+def attempt(score, user_id="alice", symbol="a", timestamp=0.0) -> Attempt:
+    return Attempt(
+        timestamp=timestamp,
+        user_id=user_id,
+        reference_id="r1",
+        language="en",
+        symbol=symbol,
+        mode="summary",
+        similarity_score=score,
+        centroid=500.0,
+        rms=0.1,
+        duration=1.0
+    )
+
+@pytest.fixture
+def log(tmp_path):
+    log = AttemptLog(tmp_path / "attempts.db", alpha=ALPHA)
+    yield log
+    log.close()
+
+def test_aggregates_match_the_attempts(log):
+    scores = [40.0, 60.0, 50.0, 80.0]
+    for i, score in enumerate(scores):
+        log.record(attempt(score, timestamp=100.0 + i))
+    log.flush()
+
+    [progress] = log.progress("alice")
+    assert progress.count == 4
+    assert progress.mean == pytest.approx(sum(scores) / 4)
+    assert progress.best == 80.0
+    assert progress.last == 80.0
+    assert (progress.first_at, progress.last_at) == (100.0, 103.0)
+
+    # The same recurrences, one attempt at a time
+    rolling_mean, trend = scores[0], 0.0
+    for score in scores[1:]:
+        trend += ALPHA * ((score - rolling_mean) - trend)
+        rolling_mean += ALPHA * (score - rolling_mean)
+    assert progress.rolling_mean == pytest.approx(rolling_mean)
+    assert progress.trend == pytest.approx(trend)
+
+def test_trend_follows_the_direction_of_scores(log):
+    for score in (20.0, 40.0, 60.0, 80.0):
+        log.record(attempt(score, user_id="improving"))
+    for score in (80.0, 60.0, 40.0, 20.0):
+        log.record(attempt(score, user_id="declining"))
+    log.flush()
+    assert log.progress("improving")[0].trend > 0
+    assert log.progress("declining")[0].trend < 0
+
+def test_aggregates_per_phoneme_and_filters(log):
+    log.record(attempt(50.0, symbol="a"))
+    log.record(attempt(70.0, symbol="i"))
+    log.record(attempt(90.0, symbol="i"))
+    log.flush()
+    assert [(p.symbol, p.count) for p in log.progress("alice")] == [("a", 1), ("i", 2)]
+    assert [p.symbol for p in log.progress("alice", symbol="i")] == ["i"]
+    assert log.progress("alice", language="fr") == []
+
+def test_unaggregated_attempts_are_still_logged(log):
+    log.record(attempt(None))
+    log.record(attempt(55.0, user_id=None))
+    log.flush()
+    assert log.progress("alice") == []
+    assert [a.similarity_score for a in log.attempts("alice")] == [None]
+
+def test_attempts_newest_first(log):
+    for i in range(5):
+        log.record(attempt(float(i), timestamp=float(i)))
+    log.flush()
+    assert [a.timestamp for a in log.attempts("alice", limit=3)] == [4.0, 3.0, 2.0]
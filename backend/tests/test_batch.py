@@ -0,0 +1,67 @@
+import json
+import pytest
+from app.services.batch import BatchItem, build_record, run_batch
+from app.services.feature_extractor import FeatureExtractor
+from .test_analysis_engine import wav
+from .test_bulk_import import archive, manifest, post
+
+def test_run_batch_reports_every_item():
+    def unreadable() -> bytes:
+        raise OSError("gone")
+
+    items = [
+        BatchItem("short.wav", lambda: wav(0.25)),
+        BatchItem("long.wav", lambda: wav(0.75)),
+        BatchItem("broken.wav", lambda: b"not audio"),
+        BatchItem("gone.wav", unreadable)
+    ]
+    results = {item.name: (analysis, error) for item, analysis, error in run_batch(items, 2, FeatureExtractor())}
+    assert set(results) == {item.name for item in items}
+
+    records = {name: build_record(name, analysis, error=error) for name, (analysis, error) in results.items()}
+    assert records["short.wav"].duration == pytest.approx(0.25, abs=1e-3)
+    assert records["long.wav"].duration == pytest.approx(0.75, abs=1e-3)
+    assert records["long.wav"].status == "ok"
+    assert records["broken.wav"].status == "error"
+    assert records["gone.wav"].error == "Failed to read file: gone"
+
+def test_batch_route_streams_scored_records(client):
+    imported = post(client, archive({
+        "manifest.jsonl": manifest({"path": "a.wav", "language": "xx", "symbol": "a"}),
+        "a.wav": wav()
+    })).json()
+    reference_id = imported["items"][0]["reference"]["id"]
+
+    content = archive({
+        "one.wav": wav(0.5),
+        "nested/two.wav": wav(0.3),
+        "broken.wav": b"not audio",
+        "notes.txt": b"skipped"
+    })
+    response = client.post(
+        "/api/audio/batch",
+        params={"language": "xx"},
+        files={"file": ("batch.zip", content, "application/zip")}
+    )
+    assert response.status_code == 200
+    assert response.headers["X-Batch-Total"] == "3"
+
+    records = {record["file"]: record for record in map(json.loads, response.text.splitlines())}
+    assert set(records) == {"one.wav", "nested/two.wav", "broken.wav"}
+    assert records["broken.wav"]["status"] == "error"
+    for name, duration in (("one.wav", 0.5), ("nested/two.wav", 0.3)):
+        assert records[name]["status"] == "ok"
+        assert records[name]["duration"] == pytest.approx(duration, abs=1e-3)
+        assert records[name]["reference_id"] == reference_id
+        assert records[name]["symbol"] == "a"
+        assert 0 < records[name]["similarity_score"] <= 100
+
+def test_batch_route_without_matching_references(client):
+    response = client.post(
+        "/api/audio/batch",
+        params={"language": "none"},
+        files={"file": ("batch.zip", archive({"one.wav": wav()}), "application/zip")}
+    )
+    [record] = map(json.loads, response.text.splitlines())
+    assert record["status"] == "ok"
+    assert record["reference_id"] is None
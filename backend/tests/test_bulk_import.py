@@ -0,0 +1,69 @@
+import io
+import json
+import zipfile
+from pathlib import Path
+from app.dependencies import config_store
+from .test_analysis_engine import wav
+
+def archive(files: dict) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for name, content in files.items():
+            zf.writestr(name, content)
+    return buffer.getvalue()
+
+def manifest(*rows) -> str:
+    return "\n".join(json.dumps(row) for row in rows)
+
+def post(client, content: bytes, **data):
+    return client.post(
+        "/api/config/references/bulk",
+        files={"archive": ("refs.zip", content, "application/zip")},
+        data=data
+    )
+
+def test_bad_entries_do_not_stop_the_others(client):
+    content = archive({
+        "refs/manifest.jsonl": manifest(
+            {"path": "a.wav", "language": "en", "symbol": "a"},
+            {"path": "missing.wav", "language": "en", "symbol": "b"},
+            {"path": "e.wav", "symbol": "e"},
+            {"path": "broken.wav", "language": "en", "symbol": "i"},
+            {"path": "notes.txt", "language": "en", "symbol": "o"},
+            {"path": "u.wav", "language": "en", "symbol": "u"}
+        ),
+        "refs/a.wav": wav(),
+        "refs/e.wav": wav(),
+        "refs/broken.wav": b"not audio",
+        "refs/notes.txt": b"text",
+        "refs/u.wav": wav()
+    })
+    response = post(client, content, tolerance="0.2")
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["imported"], body["failed"]) == (2, 4)
+
+    items = {item["file"]: item for item in body["items"]}
+    assert [items[name]["status"] for name in ("a.wav", "u.wav")] == ["ok", "ok"]
+    assert items["missing.wav"]["error"] == "missing.wav is not in the archive"
+    assert items["e.wav"]["error"].startswith("Invalid manifest entry")
+    assert items["broken.wav"]["status"] == "error"
+    assert items["notes.txt"]["error"] == "notes.txt is not an audio file"
+
+    for name in ("a.wav", "u.wav"):
+        reference = config_store.get_reference(items[name]["reference"]["id"])
+        assert reference.features is not None
+        assert Path(reference.audioPath).exists()
+
+def test_archive_without_manifest_is_rejected(client):
+    response = post(client, archive({"a.wav": wav()}))
+    assert response.status_code == 400
+    assert "no manifest" in response.json()["detail"]
+
+def test_unreadable_manifest_is_rejected(client):
+    response = post(client, archive({"manifest.json": "{}", "a.wav": wav()}))
+    assert response.status_code == 400
+
+def test_non_zip_is_rejected(client):
+    response = post(client, b"not a zip")
+    assert response.status_code == 400
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from app.services.dtw import banded_dtw
+
+def naive_dtw(cost: np.ndarray, radius: int) -> float:
+    """The textbook recurrence over the same Sakoe-Chiba band, one cell at a time."""
+    n, m = cost.shape
+    slope = (m - 1) / max(n - 1, 1)
+    radius = max(radius, int(np.ceil(slope)))
+    D = np.full((n + 1, m + 1), np.inf)
+    D[0, 0] = 0.0
+    for i in range(n):
+        center = i * slope
+        for j in range(m):
+            if np.floor(center - radius) <= j <= np.ceil(center + radius):
+                D[i + 1, j + 1] = cost[i, j] + min(D[i, j + 1], D[i + 1, j], D[i, j])
+    return D[n, m] / (n + m)
+
+@pytest.mark.parametrize("n, m", [(1, 1), (1, 7), (7, 1), (12, 12), (20, 9), (9, 31)])
+@pytest.mark.parametrize("radius", [0, 2, 5, 100])
+def test_matches_naive_recurrence(n, m, radius):
+    cost = np.random.default_rng(n * 100 + m).random((n, m))
+    assert banded_dtw(cost, radius) == pytest.approx(naive_dtw(cost, radius))
+
+def test_wide_band_is_unconstrained_dtw():
+    cost = np.random.default_rng(0).random((15, 25))
+    n, m = cost.shape
+    D = np.full((n + 1, m + 1), np.inf)
+    D[0, 0] = 0.0
+    for i in range(n):
+        for j in range(m):
+            D[i + 1, j + 1] = cost[i, j] + min(D[i, j + 1], D[i + 1, j], D[i, j])
+    assert banded_dtw(cost, radius=m) == pytest.approx(D[n, m] / (n + m))
+
+def test_identical_sequences_cost_nothing():
+    x = np.random.default_rng(1).random((30, 4))
+    cost = np.linalg.norm(x[:, None] - x[None], axis=2)
+    assert banded_dtw(cost, radius=3) == 0.0
+
+def test_empty_sequence_is_infinitely_far():
+    assert banded_dtw(np.zeros((0, 5)), radius=2) == float("inf")
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from app.models.audio import AnalysisResult
+from app.models.frames import FrameFeatures
+from app.models.phoneme import PhonemeFeatures
+from app.services.feature_cache import FeatureCache
+from app.services.feature_extractor import FeatureExtractor
+
+def result(fundamental=210.5, formants=(700.0, 1100.0, 2400.0), frames=True) -> AnalysisResult:
+    rng = np.random.default_rng(0)
+    return AnalysisResult(
+        features=PhonemeFeatures(
+            frequencyRange=(120.0, 3100.0),
+            amplitudeRange=(0.05, 0.15),
+            durationRange=(0.8, 1.2),
+            centroid=1800.0,
+            rms=0.1,
+            fundamental=fundamental,
+            formants=formants
+        ),
+        envelope=[0.0, 0.5, 1.0],
+        spectrum=[1.0, 0.25],
+        frames=FrameFeatures(
+            rms=rng.random(40),
+            centroid=rng.random(40) * 3000,
+            mfcc=rng.standard_normal((13, 40)),
+            hop_seconds=512 / 22050,
+            formants=rng.random((3, 40)) * 3000
+        ) if frames else None
+    )
+
+def test_round_trip(tmp_path):
+    cache = FeatureCache(tmp_path)
+    original = result()
+    key = cache.key(b"audio", {"version": 1})
+    assert cache.get(key) is None
+
+    cache.put(key, original)
+    loaded = cache.get(key)
+    assert loaded.features == original.features
+    assert loaded.envelope == pytest.approx(original.envelope)
+    assert loaded.spectrum == pytest.approx(original.spectrum)
+    for name, array in original.frames.arrays().items():
+        assert np.array_equal(loaded.frames.arrays()[name], array)
+    assert loaded.frames.hop_seconds == pytest.approx(original.frames.hop_seconds)
+
+def test_round_trip_without_optional_values(tmp_path):
+    cache = FeatureCache(tmp_path)
+    key = cache.key(b"audio", {})
+    cache.put(key, result(fundamental=None, formants=None, frames=False))
+    loaded = cache.get(key)
+    assert loaded.features.fundamental is None
+    assert loaded.features.formants is None
+    assert loaded.frames is None
+
+def test_key_depends_on_content_and_parameters():
+    params = FeatureExtractor().cache_params()
+    key = FeatureCache.key(b"audio", params)
+    assert FeatureCache.key(b"audio", dict(reversed(list(params.items())))) == key
+    assert FeatureCache.key(b"other audio", params) != key
+    assert FeatureCache.key(b"audio", {**params, "version": params["version"] + 1}) != key
+    assert FeatureCache.key(b"audio", FeatureExtractor(pitch_method="yin").cache_params()) != key
+    assert FeatureCache.key(b"audio", FeatureExtractor(trim_threshold_db=None).cache_params()) != key
+
+def test_parameter_change_misses(tmp_path):
+    cache = FeatureCache(tmp_path)
+    cache.put(cache.key(b"audio", FeatureExtractor().cache_params()), result())
+    assert cache.get(cache.key(b"audio", FeatureExtractor(pitch_method="yin").cache_params())) is None
+
+def test_unreadable_entry_is_a_miss(tmp_path):
+    cache = FeatureCache(tmp_path)
+    key = cache.key(b"audio", {})
+    cache.put(key, result())
+    next(tmp_path.rglob("*.npz")).write_bytes(b"truncated")
+    assert cache.get(key) is None
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from scipy.linalg import solve_toeplitz
+from scipy.signal import lfilter
+from app.services.analysis_context import AnalysisContext
+from app.services.formants import LPC_ORDER, levinson, lpc_formants, median_formants
+
+SR = 22050
+
+def vowel(formants, f0=120.0, bandwidths=(80.0, 90.0, 120.0), duration=1.0) -> np.ndarray:
+    """Impulse train at `f0` through a glottal low-pass and one resonator per formant."""
+    x = np.zeros(int(SR * duration))
+    x[::int(SR / f0)] = 1.0
+    x = lfilter([1.0], [1.0, -0.9], x)
+    for frequency, bandwidth in zip(formants, bandwidths):
+        r = np.exp(-np.pi * bandwidth / SR)
+        theta = 2 * np.pi * frequency / SR
+        x = lfilter([1 - r], [1.0, -2 * r * np.cos(theta), r * r], x)
+    return (0.5 * x / np.abs(x).max()).astype(np.float32)
+
+@pytest.mark.parametrize("formants, f0", [
+    ((730, 1090, 2440), 120),  # /a/
+    ((270, 2290, 3010), 120),  # /i/
+    ((300, 870, 2240), 120),  # /u/
+    ((850, 1220, 2810), 220),  # /a/, higher voice
+])
+def test_recovers_synthetic_vowel(formants, f0):
+    context = AnalysisContext(vowel(formants, f0), SR)
+    found = median_formants(lpc_formants(context.magnitude, SR, context.n_fft))
+    assert found == pytest.approx(formants, rel=0.08)
+
+def test_silence_has_no_formants():
+    context = AnalysisContext(np.zeros(SR, dtype=np.float32), SR)
+    result = lpc_formants(context.magnitude, SR, context.n_fft)
+    assert result.shape == (3, context.magnitude.shape[1])
+    assert np.isnan(result).all()
+    assert median_formants(result) is None
+
+def test_levinson_solves_the_normal_equations():
+    rng = np.random.default_rng(0)
+    frames = rng.standard_normal((5, 400))
+    r = np.array([[np.dot(x[:len(x) - k], x[k:]) for k in range(LPC_ORDER + 1)] for x in frames])
+    a = levinson(r, LPC_ORDER)
+    assert np.allclose(a[:, 0], 1.0)
+    for row, coefficients in zip(r, a):
+        expected = solve_toeplitz(row[:LPC_ORDER], -row[1:])
+        assert np.allclose(coefficients[1:], expected)
@@ -0,0 +1,75 @@
+import json
+import numpy as np
+import pytest
+from app.models.audio import AmplitudeFeatures, AudioAnalysisResponse, FrequencyFeatures
+from app.routes import formats
+from app.routes.formats import (
+    JSON_MEDIA_TYPE, RAW_HEADER, RAW_MAGIC, RAW_MEDIA_TYPE, RAW_VERSION,
+    binary_response, encode_raw, negotiate
+)
+
+def response() -> AudioAnalysisResponse:
+    return AudioAnalysisResponse(
+        frequency_features=FrequencyFeatures(
+            fundamental=220.0,
+            spectrum=[0.0, 0.5, 1.0, 0.25],
+            centroid=1500.0,
+            formants=[700.0, 1100.0, 2400.0]
+        ),
+        amplitude_features=AmplitudeFeatures(envelope=[0.1, 0.2, 0.3], rms=0.2),
+        similarity_score=87.5
+    )
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, JSON_MEDIA_TYPE),
+    ("", JSON_MEDIA_TYPE),
+    ("text/html", JSON_MEDIA_TYPE),
+    ("*/*", JSON_MEDIA_TYPE),
+    ("application/octet-stream", RAW_MEDIA_TYPE),
+    ("application/json, application/octet-stream", JSON_MEDIA_TYPE),
+    ("application/json;q=0.5, application/octet-stream", RAW_MEDIA_TYPE),
+    ("application/octet-stream;q=0, application/json", JSON_MEDIA_TYPE),
+    ("Application/Octet-Stream;q=0.9, text/plain", RAW_MEDIA_TYPE),
+    ("application/octet-stream;q=bad, */*;q=0.1", JSON_MEDIA_TYPE),
+])
+def test_negotiate(accept, expected):
+    assert negotiate(accept) == expected
+
+def test_negotiate_msgpack_when_installed(monkeypatch):
+    monkeypatch.setattr(formats, "msgpack_available", lambda: True)
+    assert negotiate("application/msgpack") == "application/msgpack"
+    assert negotiate("application/x-msgpack, application/json") == "application/x-msgpack"
+
+def test_negotiate_skips_msgpack_when_missing(monkeypatch):
+    monkeypatch.setattr(formats, "msgpack_available", lambda: False)
+    assert negotiate("application/msgpack") == JSON_MEDIA_TYPE
+    assert negotiate("application/msgpack, application/octet-stream;q=0.5") == RAW_MEDIA_TYPE
+
+def test_encode_raw_layout():
+    content = encode_raw(response())
+    magic, version, header_length = RAW_HEADER.unpack_from(content)
+    assert (magic, version) == (RAW_MAGIC, RAW_VERSION)
+    header = json.loads(content[RAW_HEADER.size:RAW_HEADER.size + header_length])
+    assert header["fundamental"] == 220.0
+    assert header["formants"] == [700.0, 1100.0, 2400.0]
+    assert header["similarity_score"] == 87.5
+    assert header["arrays"] == [["spectrum", 4], ["envelope", 3]]
+
+    arrays = np.frombuffer(content[RAW_HEADER.size + header_length:], dtype="<f4")
+    assert np.allclose(arrays[:4], [0.0, 0.5, 1.0, 0.25])
+    assert np.allclose(arrays[4:], [0.1, 0.2, 0.3])
+
+def test_binary_response_varies_by_accept():
+    result = binary_response(response(), RAW_MEDIA_TYPE)
+    assert result.media_type == RAW_MEDIA_TYPE
+    assert result.headers["vary"] == "Accept"
+    assert result.body == encode_raw(response())
+
+def test_msgpack_round_trip():
+    msgpack = pytest.importorskip("msgpack")
+    data = msgpack.unpackb(binary_response(response(), "application/msgpack").body)
+    frequency = data["frequency_features"]
+    assert frequency["fundamental"] == 220.0
+    assert np.allclose(np.frombuffer(frequency["spectrum"], dtype="<f4"), [0.0, 0.5, 1.0, 0.25])
+    assert np.allclose(np.frombuffer(data["amplitude_features"]["envelope"], dtype="<f4"), [0.1, 0.2, 0.3])
+    assert data["similarity_score"] == 87.5
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from app.services.analysis_context import AnalysisContext
+from app.services.pitch import DEFAULT_F0_RANGE, autocorr_f0, estimate_f0, f0_range_around, median_f0, search_range
+
+SR = 22050
+
+def harmonic_tone(f0: float, duration: float = 1.0, harmonics=(1.0, 0.5, 0.25), fundamental: bool = True) -> np.ndarray:
+    """A voiced-like tone; without `fundamental` its first partial is missing."""
+    t = np.arange(int(SR * duration)) / SR
+    y = sum(
+        amplitude * np.sin(2 * np.pi * f0 * k * t)
+        for k, amplitude in enumerate(harmonics, start=1)
+        if fundamental or k > 1
+    )
+    return (0.3 * y / np.abs(y).max()).astype(np.float32)
+
+def autocorr(y: np.ndarray, f0_range=None) -> np.ndarray:
+    context = AnalysisContext(y, SR)
+    fmin, fmax = search_range(SR, context.n_fft, f0_range)
+    return autocorr_f0(context.magnitude, SR, context.n_fft, fmin, fmax)
+
+@pytest.mark.parametrize("f0", [80.0, 110.0, 196.0, 261.6, 440.0, 880.0])
+def test_frames_of_a_steady_tone(f0):
+    frames = autocorr(harmonic_tone(f0))
+    # Skip the frames that overlap the clip's edges
+    inner = frames[4:-4]
+    assert np.isfinite(inner).all()
+    assert np.allclose(inner, f0, rtol=0.01)
+
+@pytest.mark.parametrize("f0", [100.0, 150.0, 220.0])
+def test_missing_fundamental(f0):
+    assert median_f0(autocorr(harmonic_tone(f0, harmonics=(1.0, 1.0, 1.0, 1.0), fundamental=False))) == pytest.approx(f0, rel=0.01)
+
+def test_no_octave_errors_with_strong_harmonics():
+    f0 = 150.0
+    y = harmonic_tone(f0, harmonics=(0.3, 1.0, 0.8, 0.6))
+    assert median_f0(autocorr(y)) == pytest.approx(f0, rel=0.01)
+
+def test_noise_is_unvoiced():
+    y = (0.3 * np.random.default_rng(0).standard_normal(SR)).astype(np.float32)
+    assert np.isnan(autocorr(y)).mean() > 0.9
+
+def test_estimate_gates_quiet_frames():
+    y = np.concatenate([harmonic_tone(200.0), np.zeros(SR, dtype=np.float32)])
+    f0 = estimate_f0(AnalysisContext(y, SR), "autocorr")
+    assert median_f0(f0) == pytest.approx(200.0, rel=0.01)
+    assert np.isnan(f0[-20:]).all()
+
+def test_search_range():
+    assert f0_range_around(None) == DEFAULT_F0_RANGE
+    assert f0_range_around(200.0) == (100.0, 400.0)
+    # Two periods of fmin must fit in a frame, and fmax stays well below Nyquist
+    assert search_range(44100, 1024) == (2 * 44100 / 1024, DEFAULT_F0_RANGE[1])
+    assert search_range(8000, 4096) == (DEFAULT_F0_RANGE[0], 2000.0)
@@ -0,0 +1,157 @@
+import pytest
+from app.models.phoneme import PhonemeFeatures, PhonemeReference
+from app.services.configuration_store import ConfigurationStore
+from app.services.reference_backends import JsonReferenceBackend, SqliteReferenceBackend
+
+def reference(reference_id: str, symbol: str = "a") -> PhonemeReference:
+    return PhonemeReference(
+        id=reference_id,
+        language="en",
+        symbol=symbol,
+        audioPath=f"data/reference_audio/{reference_id}.wav",
+        features=PhonemeFeatures(
+            frequencyRange=(100, 900),
+            amplitudeRange=(0.05, 0.15),
+            durationRange=(0.8, 1.2),
+            centroid=500,
+            rms=0.1
+        )
+    )
+
+@pytest.fixture
+def backends(tmp_path):
+    """Two connections to one database, standing in for two processes."""
+    writer = SqliteReferenceBackend(tmp_path / "references.db")
+    reader = SqliteReferenceBackend(tmp_path / "references.db")
+    writer.scan(full=True)
+    reader.scan(full=True)
+    yield writer, reader
+    writer.close()
+    reader.close()
+
+def test_changed_after_save(backends):
+    writer, reader = backends
+    assert not reader.changed()
+
+    writer.save_many([reference("r1"), reference("r2")])
+    assert reader.changed()
+    updated, removed = reader.scan()
+    assert [ref.id for ref in updated] == ["r1", "r2"]
+    assert removed == []
+    assert not reader.changed()
+
+def test_changed_after_update(backends):
+    writer, reader = backends
+    writer.save_many([reference("r1")])
+    reader.scan()
+
+    writer.save_many([reference("r1", symbol="b")])
+    assert reader.changed()
+    updated, _ = reader.scan()
+    assert [(ref.id, ref.symbol) for ref in updated] == [("r1", "b")]
+
+def test_changed_after_delete(backends):
+    writer, reader = backends
+    writer.save_many([reference("r1"), reference("r2")])
+    reader.scan()
+
+    writer.delete("r1")
+    assert reader.changed()
+    updated, removed = reader.scan()
+    assert updated == []
+    assert removed == ["r1"]
+    assert not reader.changed()
+    assert [ref.id for ref in reader.scan(full=True)[0]] == ["r2"]
+
+def test_own_writes_are_not_rescanned(backends):
+    writer, _ = backends
+    writer.save_many([reference("r1")])
+    writer.delete("r1")
+    assert not writer.changed()
+    assert writer.scan() == ([], [])
+
+def test_other_writes_are_not_skipped_by_own_writes(backends):
+    writer, reader = backends
+    writer.save_many([reference("r1")])
+    reader.save_many([reference("r2")])
+    # r1 came first and has not been scanned, so r2 is read again as well
+    updated, _ = reader.scan()
+    assert [ref.id for ref in updated] == ["r1", "r2"]
+
+@pytest.fixture
+def json_backends(tmp_path):
+    """Two JSON backends on one directory, standing in for two processes."""
+    writer = JsonReferenceBackend(tmp_path)
+    reader = JsonReferenceBackend(tmp_path)
+    writer.scan(full=True)
+    reader.scan(full=True)
+    return writer, reader
+
+def count_parses(monkeypatch) -> list:
+    parsed = []
+    parse_file = PhonemeReference.parse_file
+
+    def counting(path, **kwargs):
+        parsed.append(path.name)
+        return parse_file(path, **kwargs)
+
+    monkeypatch.setattr(PhonemeReference, "parse_file", counting)
+    return parsed
+
+def test_json_scan_reads_only_changed_files(json_backends, monkeypatch):
+    writer, reader = json_backends
+    writer.save_many([reference(f"r{i}") for i in range(5)])
+    assert reader.changed()
+    assert sorted(ref.id for ref in reader.scan()[0]) == [f"r{i}" for i in range(5)]
+    assert not reader.changed()
+
+    parsed = count_parses(monkeypatch)
+    writer.save_many([reference("r2", symbol="changed")])
+    updated, removed = reader.scan()
+    assert [(ref.id, ref.symbol) for ref in updated] == [("r2", "changed")]
+    assert removed == []
+    assert parsed == ["r2.json"]
+
+    # Nothing changed, nothing is parsed
+    assert reader.scan() == ([], [])
+    assert parsed == ["r2.json"]
+
+def test_json_scan_reports_deleted_files(json_backends):
+    writer, reader = json_backends
+    writer.save_many([reference("r1"), reference("r2")])
+    reader.scan()
+
+    writer.delete("r1")
+    assert reader.changed()
+    assert reader.scan() == ([], ["r1"])
+
+def test_json_own_writes_are_not_rescanned(json_backends, monkeypatch):
+    writer, _ = json_backends
+    parsed = count_parses(monkeypatch)
+    writer.save_many([reference("r1")])
+    writer.delete("r1")
+    writer.save_many([reference("r2")])
+    assert not writer.changed()
+    assert writer.scan() == ([], [])
+    assert parsed == []
+
+def test_json_full_scan_rereads_everything(json_backends):
+    writer, reader = json_backends
+    writer.save_many([reference("r1"), reference("r2")])
+    reader.scan()
+    assert sorted(ref.id for ref in reader.scan(full=True)[0]) == ["r1", "r2"]
+
+def test_store_picks_up_changes_from_another_store(tmp_path):
+    first = ConfigurationStore(tmp_path / "configurations", refresh_interval=3600.0)
+    second = ConfigurationStore(tmp_path / "configurations", refresh_interval=3600.0)
+    version = second.version
+
+    first.save_references([reference("r1"), reference("r2", symbol="b")])
+    # The directory changed, so the long refresh interval does not delay this
+    assert {ref.id for ref in second.list_references()} == {"r1", "r2"}
+    assert [ref.id for ref in second.list_references(symbol="b")] == ["r2"]
+    assert second.version > version
+
+    first.delete_reference("r1")
+    assert second.get_reference("r1") is None
+    assert [ref.id for ref in second.list_references()] == ["r2"]
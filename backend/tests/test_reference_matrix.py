@@ -0,0 +1,80 @@
+import threading
+from app.models.audio import AudioFeatures
+from app.models.phoneme import PhonemeFeatures, PhonemeReference
+from app.services.configuration_store import ConfigurationStore
+from app.services.feature_extractor import FeatureExtractor
+from app.services.reference_backends import SqliteReferenceBackend
+from app.services.reference_matrix import ReferenceMatrix
+
+N_SYMBOLS = 20
+
+def features(index: int) -> dict:
+    low = 100 + 10 * (index % 50)
+    return dict(
+        frequencyRange=(low, low + 800),
+        amplitudeRange=(0.05, 0.15),
+        durationRange=(0.8, 1.2),
+        centroid=500 + index % 50,
+        rms=0.1
+    )
+
+def reference(index: int) -> PhonemeReference:
+    return PhonemeReference(
+        id=f"r{index}",
+        language="en" if index % 2 else "fr",
+        symbol=f"s{index % N_SYMBOLS}",
+        audioPath=f"data/reference_audio/r{index}.wav",
+        features=PhonemeFeatures(**features(index))
+    )
+
+def make_matrix(tmp_path):
+    store = ConfigurationStore(
+        tmp_path / "configurations",
+        refresh_interval=0.0,
+        backend=SqliteReferenceBackend(tmp_path / "references.db")
+    )
+    return store, ReferenceMatrix(store, FeatureExtractor())
+
+def test_filters_and_ranks(tmp_path):
+    store, matrix = make_matrix(tmp_path)
+    store.save_references([reference(i) for i in range(100)])
+
+    matches = matrix.top_matches(AudioFeatures(**features(3)), top_k=3, symbol="s3")
+    assert [ref.symbol for ref, _ in matches] == ["s3"] * 3
+    assert matches[0][0].id == "r3"
+    scores = [score for _, score in matches]
+    assert scores == sorted(scores, reverse=True)
+    assert matrix.top_matches(AudioFeatures(**features(3)), language="de") == []
+    store.close()
+
+def test_consistent_under_concurrent_saves(tmp_path):
+    store, matrix = make_matrix(tmp_path)
+    attempt = AudioFeatures(**features(3))
+    stop = threading.Event()
+    errors = []
+
+    def read():
+        while not stop.is_set():
+            try:
+                for ref, _ in matrix.top_matches(attempt, top_k=3, language="en", symbol="s3"):
+                    # A reference list and matrix from different versions
+                    # pair rows with the wrong references
+                    assert (ref.language, ref.symbol) == ("en", "s3"), ref
+            except Exception as e:
+                errors.append(e)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for thread in readers:
+        thread.start()
+    try:
+        for batch in range(40):
+            store.save_references([reference(batch * 50 + i) for i in range(50)])
+    finally:
+        stop.set()
+        for thread in readers:
+            thread.join()
+
+    assert errors == []
+    # Every s3 index is odd, so all of them are English
+    assert len(matrix.top_matches(attempt, top_k=10_000, language="en", symbol="s3")) == 40 * 50 // N_SYMBOLS
+    store.close()
@@ -0,0 +1,47 @@
+import time
+from app.services.result_cache import ResultCache
+
+def test_get_returns_what_was_put():
+    cache = ResultCache(max_entries=4, ttl=60.0, name="test_cache")
+    assert cache.get("k", "r1") is None
+    cache.put("k", "r1", {"score": 1})
+    assert cache.get("k", "r1") == {"score": 1}
+    # Keyed by reference as well as content
+    assert cache.get("k", "r2") is None
+
+def test_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2, ttl=60.0, name="test_cache")
+    cache.put("a", "r", 1)
+    cache.put("b", "r", 2)
+    cache.get("a", "r")
+    cache.put("c", "r", 3)
+    assert len(cache) == 2
+    assert cache.get("b", "r") is None
+    assert cache.get("a", "r") == 1
+    assert cache.get("c", "r") == 3
+
+def test_entries_expire_after_ttl():
+    cache = ResultCache(max_entries=4, ttl=0.05, name="test_cache")
+    cache.put("k", "r", 1)
+    assert cache.get("k", "r") == 1
+    time.sleep(0.1)
+    assert cache.get("k", "r") is None
+    assert len(cache) == 0
+
+def test_invalidate_drops_only_that_reference():
+    cache = ResultCache(max_entries=8, ttl=60.0, name="test_cache")
+    cache.put("a", "r1", 1)
+    cache.put("b", "r1", 2)
+    cache.put("a", "r2", 3)
+    cache.invalidate("r1")
+    assert cache.get("a", "r1") is None
+    assert cache.get("b", "r1") is None
+    assert cache.get("a", "r2") == 3
+    # Entries put after invalidation are cached again
+    cache.put("a", "r1", 4)
+    assert cache.get("a", "r1") == 4
+
+def test_size_zero_disables_caching():
+    cache = ResultCache(max_entries=0, ttl=60.0, name="test_cache")
+    cache.put("k", "r", 1)
+    assert cache.get("k", "r") is None
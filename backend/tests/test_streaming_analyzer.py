@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from app.services.analysis_context import AnalysisContext
+from app.services.feature_extractor import FeatureExtractor
+from app.services.streaming_analyzer import StreamingAnalyzer
+
+SR = 22050
+
+def signal(duration: float = 1.3) -> np.ndarray:
+    """A gliding two-partial tone with a fade in and out, plus a little noise."""
+    t = np.arange(int(SR * duration)) / SR
+    f0 = 180 + 60 * t
+    phase = 2 * np.pi * np.cumsum(f0) / SR
+    y = (0.3 * np.sin(phase) + 0.1 * np.sin(3 * phase)) * np.minimum(1, 4 * np.minimum(t, t[-1] - t))
+    y += 0.002 * np.random.default_rng(0).standard_normal(len(t))
+    return y.astype(np.float32)
+
+def stream(y: np.ndarray, chunk_sizes) -> StreamingAnalyzer:
+    analyzer = StreamingAnalyzer(SR, FeatureExtractor(), keep_frames=True)
+    position = 0
+    for size in chunk_sizes:
+        if position >= len(y):
+            break
+        analyzer.push(y[position:position + size])
+        position += size
+    analyzer.push(y[position:])
+    analyzer.flush()
+    return analyzer
+
+@pytest.mark.parametrize("chunk_size", [1, 100, 512, 4096])
+def test_frames_match_offline_analysis(chunk_size):
+    y = signal(0.4 if chunk_size == 1 else 1.3)
+    analyzer = stream(y, [chunk_size] * len(y))
+    context = AnalysisContext(y, SR)
+
+    assert analyzer.frame_count == context.magnitude.shape[1]
+    assert np.allclose(analyzer.rms_frames, context.rms, rtol=1e-4, atol=1e-6)
+    assert np.allclose(analyzer.spectrum, context.magnitude.mean(axis=1), rtol=1e-4, atol=1e-6)
+
+def test_whole_clip_features_match_offline():
+    y = signal()
+    sizes = np.random.default_rng(1).integers(1, 3000, size=len(y))
+    features = stream(y, sizes).features()
+    context = AnalysisContext(y, SR)
+    offline = FeatureExtractor().extract_features_from_context(context)
+
+    assert features.rms == pytest.approx(offline.rms, rel=1e-5)
+    assert features.centroid == pytest.approx(offline.centroid, rel=1e-5)
+    assert features.frequencyRange == pytest.approx(offline.frequencyRange, rel=1e-5)
+    assert features.durationRange == pytest.approx(offline.durationRange)
+
+def test_partial_updates_only_cover_new_frames():
+    y = signal()
+    analyzer = StreamingAnalyzer(SR, FeatureExtractor())
+    assert analyzer.features() is None
+    new_frames = analyzer.push(y[:SR // 2])
+    assert len(analyzer.drain_envelope()) == new_frames
+    assert analyzer.drain_envelope() == []
+    # Too few samples to complete another frame
+    assert analyzer.push(y[SR // 2:SR // 2 + 100]) == 0
+    assert analyzer.duration == pytest.approx((SR // 2 + 100) / SR)
+
+def test_push_after_flush_fails():
+    analyzer = StreamingAnalyzer(SR, FeatureExtractor())
+    analyzer.push(signal(0.2))
+    analyzer.flush()
+    assert analyzer.flush() == 0
+    with pytest.raises(ValueError):
+        analyzer.push(signal(0.1))
@@ -0,0 +1,65 @@
+import asyncio
+import io
+import os
+import zipfile
+import pytest
+from fastapi import HTTPException, UploadFile
+from app.routes.uploads import open_archive, read_upload
+
+MB = 1024 * 1024
+
+def upload(content: bytes, declare_size: bool = True) -> UploadFile:
+    return UploadFile(io.BytesIO(content), size=len(content) if declare_size else None, filename="upload")
+
+def archive(members: dict) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, content in members.items():
+            zf.writestr(name, content)
+    return buffer.getvalue()
+
+@pytest.mark.parametrize("declare_size", [True, False])
+def test_read_upload_within_limit(declare_size):
+    content = bytes(range(256)) * 4096
+    assert asyncio.run(read_upload(upload(content, declare_size), MB)) == content
+
+@pytest.mark.parametrize("declare_size", [True, False])
+def test_read_upload_over_limit(declare_size):
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(read_upload(upload(b"x" * (MB + 1), declare_size), MB))
+    assert e.value.status_code == 413
+
+def test_open_archive_lists_members():
+    with open_archive(upload(archive({"a.wav": b"a", "sub/b.wav": b"b"})), MB, 2 * MB) as zf:
+        assert sorted(zf.namelist()) == ["a.wav", "sub/b.wav"]
+        assert zf.read("sub/b.wav") == b"b"
+
+def test_open_archive_rejects_non_zip():
+    with pytest.raises(HTTPException) as e:
+        open_archive(upload(b"not a zip"), MB, 2 * MB)
+    assert e.value.status_code == 400
+
+def test_open_archive_rejects_large_archive():
+    # Random bytes do not compress, so the archive itself is over the limit
+    content = archive({f"noise{i}.bin": os.urandom(MB // 2) for i in range(3)})
+    with pytest.raises(HTTPException) as e:
+        open_archive(upload(content, declare_size=False), MB, 8 * MB)
+    assert e.value.status_code == 413
+    assert e.value.detail.startswith("Upload exceeds")
+
+def test_open_archive_rejects_member_over_limit():
+    # A few kilobytes compressed, 4 MB once decompressed
+    content = archive({"small.wav": b"ok", "bomb.wav": bytes(4 * MB)})
+    assert len(content) < MB
+    with pytest.raises(HTTPException) as e:
+        open_archive(upload(content), MB, 64 * MB)
+    assert e.value.status_code == 413
+    assert "bomb.wav" in e.value.detail
+
+def test_open_archive_rejects_zip_bomb():
+    # Every member is within the per-file limit, together they are not
+    content = archive({f"part{i}.wav": bytes(MB - 1) for i in range(10)})
+    assert len(content) < MB
+    with pytest.raises(HTTPException) as e:
+        open_archive(upload(content), MB, 4 * MB)
+    assert e.value.status_code == 413